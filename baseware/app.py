@@ -2,64 +2,130 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 from pathlib import Path
 from typing import Optional
 
 from baseware.ghost_manager import GhostManager
+from baseware.metrics import Metrics
 from baseware.models import WorldSignal
 from baseware.renderer import Renderer
 from baseware.scheduler import Scheduler
 from baseware.system_info import SystemInfoProvider
-from baseware.world_signal_bus import WorldSignalBus
+from baseware.trace import TraceRecorder, new_trace_path
+from baseware.world_signal_bus import OVERFLOW_COALESCE_LATEST, WorldSignalBus
 
 
 class UkaiHostApp:
-    def __init__(self, baseware_root: Path) -> None:
+    def __init__(
+        self,
+        baseware_root: Path,
+        bus_mode: str = "async",
+        metrics_enabled: bool = False,
+        hot_reload: bool = True,
+        isolation: str = "thread",
+        trace: bool = False,
+        say_interval: float = 0.0,
+        restore_session: bool = False,
+    ) -> None:
         self.baseware_root = baseware_root
-        self.signal_bus = WorldSignalBus()
-        self.renderer = Renderer()
+        self.trace = trace
+        self.restore_session = restore_session
+        self.trace_recorder: Optional[TraceRecorder] = None
+        self.metrics = Metrics(enabled=metrics_enabled)
+        self.signal_bus = WorldSignalBus(
+            mode=bus_mode,
+            overflow={
+                "world.presence.changed": OVERFLOW_COALESCE_LATEST,
+                "world.uptime": OVERFLOW_COALESCE_LATEST,
+                "world.power": OVERFLOW_COALESCE_LATEST,
+                "world.network": OVERFLOW_COALESCE_LATEST,
+            },
+            metrics=self.metrics,
+        )
+        self.renderer = Renderer(say_interval=say_interval)
         self.system_info = SystemInfoProvider()
         self.scheduler = Scheduler(self.signal_bus, self.system_info)
-        self.ghost_manager = GhostManager(baseware_root, self.signal_bus, self.renderer)
+        self.ghost_manager = GhostManager(
+            baseware_root,
+            self.signal_bus,
+            self.renderer,
+            metrics=self.metrics,
+            hot_reload=hot_reload,
+            scheduler=self.scheduler,
+            isolation=isolation,
+        )
 
     def boot(self) -> None:
         self.ghost_manager.scan_installed()
-        self._publish_boot()
-        self._publish_power()
-        self._publish_network()
+        if self.trace:
+            self.start_trace()
+        self.signal_bus.publish_many([self._boot_signal(), *self.scheduler.system_signals(force=True)])
+        self.renderer.start()
+        if self.restore_session:
+            self.ghost_manager.restore_session()
         self.scheduler.start()
 
     def shutdown(self) -> None:
         self.scheduler.stop()
         payload = {"type": "world.shutdown"}
         self.signal_bus.publish(WorldSignal(type="world.shutdown", payload=payload))
+        self.signal_bus.drain()
+        self.stop_trace()
+        self.ghost_manager.shutdown()
+        self.signal_bus.close()
+        self.renderer.shutdown()
+        if self.metrics.enabled:
+            self.export_metrics()
 
     def launch_default(self) -> None:
         if not self.ghost_manager.listGhosts():
             return
         self.ghost_manager.launchGhost("default_ghost")
 
-    def _publish_boot(self) -> None:
+    def start_trace(self, path: Optional[Path] = None) -> Path:
+        if self.trace_recorder is None:
+            self.trace_recorder = TraceRecorder(
+                path or new_trace_path(self.baseware_root),
+                saves=self.ghost_manager.snapshot_saves(),
+            )
+            self.trace_recorder.attach(self.signal_bus, lambda: [self.ghost_manager.presence_signal()])
+            logging.info("Recording signal trace to %s", self.trace_recorder.path)
+        return self.trace_recorder.path
+
+    def stop_trace(self) -> Optional[Path]:
+        if self.trace_recorder is None:
+            return None
+        self.signal_bus.drain()
+        recorder = self.trace_recorder
+        self.trace_recorder = None
+        recorder.close()
+        return recorder.path
+
+    def export_metrics(self) -> Path:
+        return self.metrics.export(self.baseware_root / "runtime" / "metrics.json")
+
+    def handle_metrics_command(self, args: list[str]) -> str:
+        command = args[0] if args else "show"
+        if command == "on":
+            self.metrics.enabled = True
+            return "metrics enabled"
+        if command == "off":
+            self.metrics.enabled = False
+            return "metrics disabled"
+        if command == "reset":
+            self.metrics.reset()
+            return "metrics reset"
+        if command == "save":
+            return f"metrics written to {self.export_metrics()}"
+        snapshot = self.metrics.snapshot()
+        if command != "show":
+            snapshot = snapshot.get(command, {})
+        return json.dumps(snapshot, ensure_ascii=False, indent=2)
+
+    def _boot_signal(self) -> WorldSignal:
         payload = {"type": "world.boot"}
-        self.signal_bus.publish(WorldSignal(type="world.boot", payload=payload))
-
-    def _publish_power(self) -> None:
-        status = self.system_info.power_status()
-        payload = {
-            "type": "world.power",
-            "level": status.level,
-            "charging": status.charging,
-        }
-        self.signal_bus.publish(WorldSignal(type="world.power", payload=payload))
-
-    def _publish_network(self) -> None:
-        status = self.system_info.network_status()
-        payload = {
-            "type": "world.network",
-            "online": status.online,
-            "connection_type": status.connection_type,
-        }
-        self.signal_bus.publish(WorldSignal(type="world.network", payload=payload))
+        return WorldSignal(type="world.boot", payload=payload)
 
 
 def configure_logging(baseware_root: Path) -> None:
@@ -76,15 +142,32 @@ def configure_logging(baseware_root: Path) -> None:
 def main(baseware_root: Optional[str] = None) -> None:
     root = Path(baseware_root or Path(__file__).resolve().parent.parent / "baseware_root")
     configure_logging(root)
-    app = UkaiHostApp(root)
+    app = UkaiHostApp(
+        root,
+        metrics_enabled=os.environ.get("UKAIHOST_METRICS") == "1",
+        isolation=os.environ.get("UKAIHOST_ISOLATION", "thread"),
+        trace=os.environ.get("UKAIHOST_TRACE") == "1",
+        say_interval=float(os.environ.get("UKAIHOST_SAY_INTERVAL", "0")),
+        restore_session=os.environ.get("UKAIHOST_RESTORE_SESSION", "1") == "1",
+    )
     app.boot()
-    app.launch_default()
+    if not app.ghost_manager.listRunningGhosts():
+        app.launch_default()
     logging.info("UkaiHost running. Press Ctrl+C to exit.")
     try:
         while True:
             signal = input("ukaihost> ").strip()
             if signal == "quit":
                 break
+            if signal.split(" ")[0] == "metrics":
+                print(app.handle_metrics_command(signal.split()[1:]))
+                continue
+            if signal == "trace start":
+                print(f"recording to {app.start_trace()}")
+                continue
+            if signal == "trace stop":
+                print(f"trace saved to {app.stop_trace()}")
+                continue
             if signal == "click":
                 instance = app.ghost_manager._running.get("default_ghost")
                 if instance:
@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import fnmatch
+import mmap
+import os
+import stat as stat_module
+import struct
+import threading
+import zipfile
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+ARCHIVE_SUFFIXES = (".zip", ".nar")
+ARCHIVE_SEPARATOR = "!/"
+_LOCAL_HEADER = struct.Struct("<4s22xHH")
+_LOCAL_HEADER_MAGIC = b"PK\x03\x04"
+
+
+class ArchiveStat(NamedTuple):
+    st_mode: int
+    st_size: int
+    st_mtime_ns: int
+
+
+def is_archive(path: Path) -> bool:
+    return path.suffix.lower() in ARCHIVE_SUFFIXES
+
+
+class GhostArchive:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        stat = path.stat()
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self._lock = threading.Lock()
+        self._zip = zipfile.ZipFile(path)
+        self._mmap: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        names = [info.filename for info in self._zip.infolist()]
+        self.prefix = _common_root(names)
+        self._files: Dict[str, zipfile.ZipInfo] = {}
+        self._children: Dict[str, Dict[str, bool]] = {"": {}}
+        for info in self._zip.infolist():
+            name = info.filename[len(self.prefix) :].strip("/")
+            if not name or ".." in name.split("/"):
+                continue
+            if not info.is_dir():
+                self._files[name] = info
+            parts = name.split("/")
+            for depth in range(len(parts)):
+                parent = "/".join(parts[:depth])
+                is_dir = depth < len(parts) - 1 or info.is_dir()
+                siblings = self._children.setdefault(parent, {})
+                siblings[parts[depth]] = siblings.get(parts[depth], False) or is_dir
+                if is_dir:
+                    self._children.setdefault("/".join(parts[: depth + 1]), {})
+
+    @property
+    def root(self) -> "ArchivePath":
+        return ArchivePath(self, "")
+
+    def is_file(self, member: str) -> bool:
+        return member in self._files
+
+    def is_dir(self, member: str) -> bool:
+        return member in self._children
+
+    def children(self, member: str) -> List[str]:
+        return sorted(self._children.get(member, ()))
+
+    def files(self) -> Iterator[str]:
+        return iter(self._files)
+
+    def stat(self, member: str) -> ArchiveStat:
+        info = self._files.get(member)
+        if info is not None:
+            return ArchiveStat(stat_module.S_IFREG | 0o444, info.file_size, self.signature[0])
+        if member in self._children:
+            return ArchiveStat(stat_module.S_IFDIR | 0o555, 0, self.signature[0])
+        raise FileNotFoundError(f"{self.path}{ARCHIVE_SEPARATOR}{member}")
+
+    def read(self, member: str) -> Union[bytes, memoryview]:
+        info = self._files.get(member)
+        if info is None:
+            raise FileNotFoundError(f"{self.path}{ARCHIVE_SEPARATOR}{member}")
+        if info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1:
+            view = self._stored_view(info)
+            if view is not None:
+                return view
+        with self._lock:
+            return self._zip.read(info)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                if self._view is not None:
+                    self._view.release()
+                if self._mmap is not None:
+                    self._mmap.close()
+            except BufferError:
+                pass
+            self._view = None
+            self._mmap = None
+            self._zip.close()
+
+    def _stored_view(self, info: zipfile.ZipInfo) -> Optional[memoryview]:
+        with self._lock:
+            if self._view is None:
+                with self.path.open("rb") as handle:
+                    self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            view = self._view
+        offset = info.header_offset
+        magic, name_length, extra_length = _LOCAL_HEADER.unpack_from(view, offset)
+        if magic != _LOCAL_HEADER_MAGIC:
+            return None
+        start = offset + _LOCAL_HEADER.size + name_length + extra_length
+        if start + info.file_size > len(view):
+            return None
+        return view[start : start + info.file_size]
+
+
+def _common_root(names: List[str]) -> str:
+    # Archives are often zipped from the parent folder; treat a lone top-level folder as the ghost root.
+    if "manifest.json" in names:
+        return ""
+    tops = {name.split("/", 1)[0] for name in names}
+    if len(tops) == 1:
+        top = tops.pop()
+        if f"{top}/manifest.json" in names:
+            return f"{top}/"
+    return ""
+
+
+class ArchivePath:
+    __slots__ = ("archive", "member")
+
+    def __init__(self, archive: GhostArchive, member: str = "") -> None:
+        self.archive = archive
+        self.member = member
+
+    def __truediv__(self, other: Union[str, PurePosixPath]) -> "ArchivePath":
+        parts = self.member.split("/") if self.member else []
+        for part in str(other).replace("\\", "/").split("/"):
+            if part in ("", "."):
+                continue
+            if part == "..":
+                if parts:
+                    parts.pop()
+                continue
+            parts.append(part)
+        return ArchivePath(self.archive, "/".join(parts))
+
+    joinpath = __truediv__
+
+    def __str__(self) -> str:
+        return f"{self.archive.path}{ARCHIVE_SEPARATOR}{self.member}"
+
+    def __repr__(self) -> str:
+        return f"ArchivePath({str(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ArchivePath) and self.archive.path == other.archive.path and self.member == other.member
+
+    def __hash__(self) -> int:
+        return hash((self.archive.path, self.member))
+
+    def __lt__(self, other: "ArchivePath") -> bool:
+        return (str(self.archive.path), self.member) < (str(other.archive.path), other.member)
+
+    @property
+    def name(self) -> str:
+        return self.member.rsplit("/", 1)[-1]
+
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.name).suffix
+
+    @property
+    def stem(self) -> str:
+        return PurePosixPath(self.name).stem
+
+    @property
+    def parent(self) -> "ArchivePath":
+        return ArchivePath(self.archive, self.member.rsplit("/", 1)[0] if "/" in self.member else "")
+
+    def with_name(self, name: str) -> "ArchivePath":
+        return self.parent / name
+
+    def with_suffix(self, suffix: str) -> "ArchivePath":
+        return self.with_name(self.stem + suffix)
+
+    def absolute(self) -> "ArchivePath":
+        return self
+
+    def as_posix(self) -> str:
+        return str(self)
+
+    def relative_to(self, other: "ArchivePath") -> PurePosixPath:
+        if not self.is_relative_to(other):
+            raise ValueError(f"{self} is not in the subpath of {other}")
+        return PurePosixPath(self.member[len(other.member) :].lstrip("/"))
+
+    def is_relative_to(self, other: object) -> bool:
+        if not isinstance(other, ArchivePath) or other.archive.path != self.archive.path:
+            return False
+        return not other.member or self.member == other.member or self.member.startswith(other.member + "/")
+
+    def exists(self) -> bool:
+        return self.archive.is_file(self.member) or self.archive.is_dir(self.member)
+
+    def is_file(self) -> bool:
+        return self.archive.is_file(self.member)
+
+    def is_dir(self) -> bool:
+        return self.archive.is_dir(self.member)
+
+    def stat(self) -> ArchiveStat:
+        return self.archive.stat(self.member)
+
+    def iterdir(self) -> Iterator["ArchivePath"]:
+        if not self.is_dir():
+            raise NotADirectoryError(str(self))
+        return (self / name for name in self.archive.children(self.member))
+
+    def glob(self, pattern: str) -> Iterator["ArchivePath"]:
+        if pattern.startswith("**/"):
+            return self.rglob(pattern[3:])
+        return (path for path in self.iterdir() if fnmatch.fnmatchcase(path.name, pattern)) if self.is_dir() else iter(())
+
+    def rglob(self, pattern: str) -> Iterator["ArchivePath"]:
+        prefix = f"{self.member}/" if self.member else ""
+        names = sorted(name for name in self.archive.files() if name.startswith(prefix))
+        return (
+            ArchivePath(self.archive, name)
+            for name in names
+            if fnmatch.fnmatchcase(name.rsplit("/", 1)[-1], pattern)
+        )
+
+    def read_buffer(self) -> Union[bytes, memoryview]:
+        return self.archive.read(self.member)
+
+    def read_bytes(self) -> bytes:
+        return bytes(self.archive.read(self.member))
+
+    def read_text(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        return bytes(self.archive.read(self.member)).decode(encoding, errors)
+
+
+class ArchiveCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._archives: Dict[Path, GhostArchive] = {}
+
+    def open(self, path: Path) -> GhostArchive:
+        stat = path.stat()
+        with self._lock:
+            archive = self._archives.get(path)
+            if archive is not None and archive.signature == (stat.st_mtime_ns, stat.st_size):
+                return archive
+        opened = GhostArchive(path)
+        with self._lock:
+            previous = self._archives.get(path)
+            self._archives[path] = opened
+        if previous is not None:
+            previous.close()
+        return opened
+
+    def close(self, path: Path) -> None:
+        with self._lock:
+            archive = self._archives.pop(path, None)
+        if archive is not None:
+            archive.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            archives = list(self._archives.values())
+            self._archives.clear()
+        for archive in archives:
+            archive.close()
+
+
+archive_cache = ArchiveCache()
+
+
+def open_archive(path: Path) -> GhostArchive:
+    return archive_cache.open(path)
+
+
+def resolve_path(text: str) -> Union[Path, ArchivePath]:
+    archive_path, separator, member = text.partition(ARCHIVE_SEPARATOR)
+    if not separator:
+        return Path(text)
+    return open_archive(Path(archive_path)).root / member
+
+
+def remove_archive(path: Path) -> None:
+    archive_cache.close(path)
+    os.unlink(path)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import marshal
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BUNDLE_MAGIC = b"UKEB"
+BUNDLE_VERSION = 1
+
+EventBundle = Dict[str, Any]
+
+
+def bundle_sources(ghost_dir: Path) -> List[Path]:
+    events_dir = ghost_dir / "ghost" / "events"
+    sources = sorted(events_dir.glob("*.yaml")) if events_dir.exists() else []
+    sources.append(ghost_dir / "ghost" / "state.yaml")
+    sources.append(ghost_dir / "ghost" / "strings.yaml")
+    return sources
+
+
+def bundle_key(ghost_dir: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(BUNDLE_MAGIC + bytes([BUNDLE_VERSION]))
+    for path in bundle_sources(ghost_dir):
+        digest.update(path.relative_to(ghost_dir).as_posix().encode("utf-8") + b"\0")
+        try:
+            content = path.read_bytes()
+        except FileNotFoundError:
+            digest.update(b"\xff")
+            continue
+        digest.update(len(content).to_bytes(8, "little"))
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def bundle_path(cache_dir: Path, ghost_id: str) -> Path:
+    return cache_dir / f"{ghost_id}.events.bin"
+
+
+def load_bundle(path: Path, key: str) -> Optional[EventBundle]:
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    except OSError as exc:
+        logging.warning("Discarding unreadable event bundle %s: %s", path, exc)
+        return None
+    header_size = len(BUNDLE_MAGIC) + 1
+    if raw[: len(BUNDLE_MAGIC)] != BUNDLE_MAGIC or raw[len(BUNDLE_MAGIC) : header_size] != bytes([BUNDLE_VERSION]):
+        return None
+    try:
+        stored_key, bundle = marshal.loads(raw[header_size:])
+    except (EOFError, ValueError, TypeError):
+        logging.warning("Discarding unreadable event bundle %s", path)
+        return None
+    if stored_key != key or not isinstance(bundle, dict):
+        return None
+    return bundle
+
+
+def store_bundle(path: Path, key: str, bundle: EventBundle) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_bytes(BUNDLE_MAGIC + bytes([BUNDLE_VERSION]) + marshal.dumps((key, bundle)))
+        os.replace(temp_path, path)
+    except (OSError, ValueError):
+        logging.exception("Failed to write event bundle %s", path)
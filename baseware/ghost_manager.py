@@ -2,14 +2,25 @@ from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
+import os
+import shutil
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
+from baseware.archive_fs import ArchivePath, is_archive, open_archive, remove_archive
 from baseware.ghost_runner import GhostRunnerStub
-from baseware.models import GhostManifest, PresenceRegistry, WorldSignal
+from baseware.hot_reload import GhostWatcher
+from baseware.metrics import Metrics
+from baseware.models import Action, GhostManifest, PresenceRegistry, ShellDefinition, WorldSignal
+from baseware.process_runner import RunnerPool
 from baseware.renderer import BalloonWindow, CharacterWindow, Renderer
-from baseware.save_store import SaveStore
+from baseware.save_store import SaveStore, SaveStoreStats
+from baseware.scheduler import Scheduler
 from baseware.shell_loader import ShellLoader
 from baseware.world_signal_bus import WorldSignalBus
 from baseware.yaml_runtime import YamlGhostRunner
@@ -22,31 +33,147 @@ class GhostInstance:
     character: CharacterWindow
     balloon: BalloonWindow
     save_store: SaveStore
+    subscriber: Optional[Callable[[WorldSignal], None]] = None
+    batch_subscriber: Optional[Callable[[List[WorldSignal]], None]] = None
+    topics: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _PreparedGhost:
+    manifest: GhostManifest
+    shell: ShellDefinition
+    save_store: SaveStore
+    runner: object
+    balloon_style: Optional[dict]
+
+
+@dataclass
+class ScanReport:
+    total: int = 0
+    parsed: int = 0
+    cached: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
 
 
 class GhostManager:
+    MANIFEST_INDEX_VERSION = 2
+    SESSION_VERSION = 1
+    ISOLATION_MODES = ("thread", "process")
+
     def __init__(
         self,
         baseware_root: Path,
         signal_bus: WorldSignalBus,
         renderer: Renderer,
+        write_behind_saves: bool = True,
+        metrics: Optional[Metrics] = None,
+        hot_reload: bool = False,
+        scheduler: Optional[Scheduler] = None,
+        isolation: str = "thread",
     ) -> None:
+        if isolation not in self.ISOLATION_MODES:
+            raise ValueError(f"Unknown isolation mode: {isolation}")
         self.baseware_root = baseware_root
         self.signal_bus = signal_bus
         self.renderer = renderer
+        self.scheduler = scheduler
+        self.write_behind_saves = write_behind_saves
+        self.metrics = metrics
+        self.watcher = GhostWatcher() if hot_reload else None
+        self.isolation = isolation
+        self.runner_pool = RunnerPool(self._apply_actions) if isolation == "process" else None
         self.shell_loader = ShellLoader()
         self.presence = PresenceRegistry()
+        self.scan_workers = min(8, (os.cpu_count() or 1) + 4)
+        self.last_scan = ScanReport()
         self._installed: Dict[str, GhostManifest] = {}
+        self._sources: Dict[str, Path] = {}
         self._running: Dict[str, GhostInstance] = {}
+        self._action_listeners: List[Callable[[str, List[Action]], None]] = []
+
+    @property
+    def manifest_index_path(self) -> Path:
+        return self.baseware_root / "runtime" / "manifest_index.json"
+
+    @property
+    def session_path(self) -> Path:
+        return self.baseware_root / "runtime" / "session.json"
 
-    def scan_installed(self) -> None:
+    def ghost_dir(self, ghost_id: str) -> Union[Path, ArchivePath]:
+        source = self._sources.get(ghost_id, self.baseware_root / "ghosts" / ghost_id)
+        if is_archive(source):
+            return open_archive(source).root
+        return source
+
+    def scan_installed(self) -> ScanReport:
+        start = time.perf_counter()
+        report = ScanReport()
         ghosts_dir = self.baseware_root / "ghosts"
         self._installed.clear()
         if not ghosts_dir.exists():
-            return
-        for manifest_path in ghosts_dir.glob("*/manifest.json"):
-            manifest = self._load_manifest(manifest_path)
+            self.last_scan = report
+            return report
+        index = self._read_manifest_index()
+        entries: Dict[str, Dict[str, Any]] = {}
+        stale: List[Tuple[str, Path, os.stat_result]] = []
+        with os.scandir(ghosts_dir) as folders:
+            for folder in sorted(folders, key=lambda entry: entry.name):
+                if folder.is_dir():
+                    manifest_path = Path(folder.path) / "manifest.json"
+                    try:
+                        stat = manifest_path.stat()
+                    except FileNotFoundError:
+                        continue
+                elif folder.is_file() and is_archive(Path(folder.name)):
+                    manifest_path = Path(folder.path)
+                    stat = folder.stat()
+                else:
+                    continue
+                report.total += 1
+                cached = index.get(folder.name)
+                if cached and cached.get("mtime_ns") == stat.st_mtime_ns and cached.get("size") == stat.st_size:
+                    entries[folder.name] = cached
+                    report.cached += 1
+                else:
+                    stale.append((folder.name, manifest_path, stat))
+        if len(stale) > 1:
+            with ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix="manifest-scan") as pool:
+                parsed = list(pool.map(self._parse_manifest_entry, stale))
+        else:
+            parsed = [self._parse_manifest_entry(item) for item in stale]
+        for folder_name, entry, error in parsed:
+            if error is not None:
+                report.errors[folder_name] = error
+                logging.warning("Invalid manifest in %s: %s", folder_name, error)
+                continue
+            entries[folder_name] = entry
+            report.parsed += 1
+        self._sources.clear()
+        for folder_name in sorted(entries):
+            manifest = GhostManifest(**entries[folder_name]["manifest"])
             self._installed[manifest.id] = manifest
+            self._sources[manifest.id] = ghosts_dir / folder_name
+        if report.parsed or len(entries) != len(index):
+            self._write_manifest_index(entries)
+        report.elapsed = time.perf_counter() - start
+        self.last_scan = report
+        logging.info(
+            "Scanned %d ghosts in %.1f ms (%d parsed, %d cached, %d errors)",
+            report.total,
+            report.elapsed * 1000,
+            report.parsed,
+            report.cached,
+            len(report.errors),
+        )
+        return report
+
+    def add_action_listener(self, listener: Callable[[str, List[Action]], None]) -> None:
+        self._action_listeners.append(listener)
+
+    def remove_action_listener(self, listener: Callable[[str, List[Action]], None]) -> None:
+        if listener in self._action_listeners:
+            self._action_listeners.remove(listener)
 
     def listGhosts(self) -> List[GhostManifest]:
         return list(self._installed.values())
@@ -61,71 +188,456 @@ class GhostManager:
         if not manifest:
             logging.warning("Ghost %s not installed", ghost_id)
             return None
-        ghost_dir = self.baseware_root / "ghosts" / ghost_id
-        shell_dir = ghost_dir / manifest.shell_default
-        shell = self.shell_loader.load(shell_dir, manifest.shell_surfaces)
-        save_path = ghost_dir / manifest.storage_path
-        save_store = SaveStore(save_path)
+        instance = self._register_ghost(self._prepare_ghost(manifest))
+        self._publish_presence()
+        self._activate_ghost(instance)
+        return instance
+
+    def launchGhosts(self, ghost_ids: List[str]) -> Dict[str, GhostInstance]:
+        launched: Dict[str, GhostInstance] = {}
+        manifests: List[GhostManifest] = []
+        for ghost_id in dict.fromkeys(ghost_ids):
+            if ghost_id in self._running:
+                launched[ghost_id] = self._running[ghost_id]
+            elif ghost_id in self._installed:
+                manifests.append(self._installed[ghost_id])
+            else:
+                logging.warning("Ghost %s not installed", ghost_id)
+        if not manifests:
+            return launched
+        if len(manifests) > 1:
+            with ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix="ghost-launch") as pool:
+                prepared = list(pool.map(self._try_prepare_ghost, manifests))
+        else:
+            prepared = [self._try_prepare_ghost(manifests[0])]
+        instances: List[GhostInstance] = []
+        for item in prepared:
+            if item is None:
+                continue
+            try:
+                instances.append(self._register_ghost(item))
+            except Exception:
+                logging.exception("Failed to launch ghost %s", item.manifest.id)
+        if instances:
+            self._publish_presence()
+        for instance in instances:
+            self._activate_ghost(instance)
+            launched[instance.manifest.id] = instance
+        return launched
+
+    def _prepare_ghost(self, manifest: GhostManifest) -> _PreparedGhost:
+        ghost_dir = self.ghost_dir(manifest.id)
+        shell = self.shell_loader.load(ghost_dir / manifest.shell_default, manifest.shell_surfaces)
+        save_store = SaveStore(self._save_path(manifest, ghost_dir), write_behind=self.write_behind_saves)
         save_store.ensure_initialized()
-        runner = self._create_runner(manifest, ghost_dir, save_store)
-        character = self.renderer.create_character(ghost_id, shell, self._on_click_factory(ghost_id))
-        balloon = self.renderer.create_balloon(
-            ghost_id,
-            self._load_balloon_style(manifest),
-            shell.bubble_offset,
-        )
-        instance = GhostInstance(
+        try:
+            runner = self._create_runner(manifest, ghost_dir, save_store)
+        except Exception:
+            save_store.close()
+            raise
+        return _PreparedGhost(
             manifest=manifest,
-            runner=runner,
-            character=character,
-            balloon=balloon,
+            shell=shell,
             save_store=save_store,
+            runner=runner,
+            balloon_style=self._load_balloon_style(manifest),
         )
-        self._running[ghost_id] = instance
-        self.presence.running[ghost_id] = manifest.name
-        self._publish_presence()
-        self.signal_bus.subscribe("*", lambda signal, gid=ghost_id: self._dispatch_to_ghost(gid, signal))
-        return instance
+
+    def _save_path(self, manifest: GhostManifest, ghost_dir: Union[Path, ArchivePath]) -> Path:
+        if not isinstance(ghost_dir, ArchivePath):
+            return ghost_dir / manifest.storage_path
+        saves_dir = (self.baseware_root / "runtime" / "saves" / manifest.id).resolve()
+        save_path = (saves_dir / manifest.storage_path).resolve()
+        if not save_path.is_relative_to(saves_dir):
+            raise ValueError(f"Ghost {manifest.id} storage path escapes {saves_dir}: {manifest.storage_path}")
+        return save_path
+
+    def _try_prepare_ghost(self, manifest: GhostManifest) -> Optional[_PreparedGhost]:
+        try:
+            return self._prepare_ghost(manifest)
+        except Exception:
+            logging.exception("Failed to launch ghost %s", manifest.id)
+            return None
+
+    def _register_ghost(self, prepared: _PreparedGhost) -> GhostInstance:
+        ghost_id = prepared.manifest.id
+        shell = prepared.shell
+        try:
+            character = self.renderer.create_character(ghost_id, shell, self._on_click_factory(ghost_id))
+            surface_ids = getattr(prepared.runner, "surface_ids", None)
+            self.renderer.prefetch_surfaces(
+                ghost_id,
+                [shell.default_surface, *(surface_ids() if surface_ids else [])],
+            )
+            balloon = self.renderer.create_balloon(ghost_id, prepared.balloon_style, shell.bubble_offset)
+            instance = GhostInstance(
+                manifest=prepared.manifest,
+                runner=prepared.runner,
+                character=character,
+                balloon=balloon,
+                save_store=prepared.save_store,
+            )
+            self._running[ghost_id] = instance
+            self.presence.running[ghost_id] = prepared.manifest.name
+            return instance
+        except Exception:
+            self._discard_prepared(prepared)
+            raise
+
+    def _discard_prepared(self, prepared: _PreparedGhost) -> None:
+        ghost_id = prepared.manifest.id
+        self._running.pop(ghost_id, None)
+        self.presence.running.pop(ghost_id, None)
+        try:
+            self.renderer.close(ghost_id)
+            prepared.save_store.close()
+            close = getattr(prepared.runner, "close", None)
+            if close is not None:
+                close()
+        except Exception:
+            logging.exception("Failed to clean up ghost %s", ghost_id)
+
+    def _activate_ghost(self, instance: GhostInstance) -> None:
+        self._subscribe_ghost(instance)
+        self._watch_ghost(instance)
 
     def closeGhost(self, ghost_id: str) -> None:
         instance = self._running.pop(ghost_id, None)
         if not instance:
             return
+        if self.watcher is not None:
+            self.watcher.unwatch(ghost_id)
+        if self.scheduler is not None:
+            self.scheduler.cancel_owner(ghost_id)
+        self._unsubscribe_ghost(instance)
         self.renderer.close(ghost_id)
+        self._close_runner(ghost_id, instance)
         self.presence.running.pop(ghost_id, None)
         self._publish_presence()
 
+    def save_path(self, ghost_id: str) -> Optional[Path]:
+        manifest = self._installed.get(ghost_id)
+        if manifest is None:
+            return None
+        return self._save_path(manifest, self.ghost_dir(ghost_id))
+
+    def snapshot_saves(self) -> Dict[str, Optional[dict]]:
+        saves: Dict[str, Optional[dict]] = {}
+        for ghost_id in self._installed:
+            try:
+                instance = self._running.get(ghost_id)
+                if instance is not None:
+                    instance.save_store.flush()
+                    flush_saves = getattr(instance.runner, "flush_saves", None)
+                    if flush_saves is not None:
+                        flush_saves()
+                path = self.save_path(ghost_id)
+                saves[ghost_id] = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                saves[ghost_id] = None
+            except (OSError, ValueError) as exc:
+                logging.warning("Could not snapshot save data for %s: %s", ghost_id, exc)
+        return saves
+
+    def restore_saves(self, saves: Dict[str, Optional[dict]]) -> None:
+        for ghost_id, payload in saves.items():
+            try:
+                path = self.save_path(ghost_id)
+                if path is None:
+                    continue
+                if payload is None:
+                    path.unlink(missing_ok=True)
+                    continue
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            except (OSError, ValueError) as exc:
+                logging.warning("Could not restore save data for %s: %s", ghost_id, exc)
+
+    def save_session(self) -> None:
+        path = self.session_path
+        payload = {"version": self.SESSION_VERSION, "running": list(self._running)}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{path.name}.tmp")
+            temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, path)
+        except OSError:
+            logging.exception("Failed to write session %s", path)
+
+    def restore_session(self) -> Dict[str, GhostInstance]:
+        try:
+            data = json.loads(self.session_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.SESSION_VERSION:
+            return {}
+        ghost_ids = [ghost_id for ghost_id in data.get("running", []) if isinstance(ghost_id, str)]
+        start = time.perf_counter()
+        launched = self.launchGhosts(ghost_ids)
+        logging.info(
+            "Restored %d of %d ghost(s) from last session in %.1f ms",
+            len(launched),
+            len(ghost_ids),
+            (time.perf_counter() - start) * 1000,
+        )
+        return launched
+
+    def shutdown(self) -> None:
+        self.save_session()
+        if self.watcher is not None:
+            self.watcher.stop()
+        for ghost_id, instance in list(self._running.items()):
+            self._close_runner(ghost_id, instance)
+        if self.runner_pool is not None:
+            self.runner_pool.shutdown()
+
     def request_delete(self, ghost_id: str) -> None:
         if ghost_id in self._running:
             self.closeGhost(ghost_id)
-        ghost_dir = self.baseware_root / "ghosts" / ghost_id
-        if ghost_dir.exists():
-            for path in ghost_dir.rglob("*"):
-                if path.is_file():
-                    path.unlink()
-            for path in sorted(ghost_dir.glob("**/*"), reverse=True):
-                if path.is_dir():
-                    path.rmdir()
-            ghost_dir.rmdir()
+        source = self._sources.pop(ghost_id, self.baseware_root / "ghosts" / ghost_id)
+        if is_archive(source) and source.is_file():
+            remove_archive(source)
+        elif source.is_dir():
+            shutil.rmtree(source)
         self._installed.pop(ghost_id, None)
 
+    def _subscribe_ghost(self, instance: GhostInstance) -> None:
+        ghost_id = instance.manifest.id
+
+        def _subscriber(signal: WorldSignal) -> None:
+            self._dispatch_to_ghost(ghost_id, signal)
+
+        def _batch_subscriber(signals: List[WorldSignal]) -> None:
+            self._dispatch_batch_to_ghost(ghost_id, signals)
+
+        _subscriber.__qualname__ = f"ghost:{ghost_id}"
+        instance.subscriber = _subscriber
+        instance.batch_subscriber = _batch_subscriber
+        topics = getattr(instance.runner, "topics", None)
+        instance.topics = list(topics()) if topics else ["#"]
+        for topic in instance.topics:
+            self.signal_bus.subscribe(topic, instance.subscriber, instance.batch_subscriber)
+
+    def _resubscribe_ghost(self, instance: GhostInstance) -> None:
+        topics = getattr(instance.runner, "topics", None)
+        if instance.subscriber is None or topics is None:
+            return
+        new_topics = list(topics())
+        for topic in new_topics:
+            if topic not in instance.topics:
+                self.signal_bus.subscribe(topic, instance.subscriber, instance.batch_subscriber)
+        for topic in instance.topics:
+            if topic not in new_topics:
+                self.signal_bus.unsubscribe(topic, instance.subscriber)
+        instance.topics = new_topics
+
+    def _watch_ghost(self, instance: GhostInstance) -> None:
+        if self.watcher is None:
+            return
+        ghost_dir = self.ghost_dir(instance.manifest.id)
+        if isinstance(ghost_dir, ArchivePath):
+            return
+        shell_dir = ghost_dir / instance.manifest.shell_default
+
+        def _include(path: Path) -> bool:
+            return path.suffix == ".yaml" or path.is_relative_to(shell_dir)
+
+        self.watcher.watch(instance.manifest.id, [ghost_dir / "ghost", shell_dir], self._on_ghost_files_changed, _include)
+        self.watcher.start()
+
+    def _on_ghost_files_changed(self, ghost_id: str, paths: List[Path]) -> None:
+        instance = self._running.get(ghost_id)
+        if not instance:
+            return
+        start = time.perf_counter()
+        shell_dir = self.ghost_dir(ghost_id) / instance.manifest.shell_default
+        shell_paths = [path for path in paths if path.is_relative_to(shell_dir)]
+        ghost_paths = [path for path in paths if not path.is_relative_to(shell_dir)]
+        reloaded: List[str] = []
+        reload = getattr(instance.runner, "reload", None)
+        if ghost_paths and reload is not None:
+            report = reload(ghost_paths)
+            if report.events:
+                reloaded.append(f"{len(report.events)} event file(s)")
+                self._resubscribe_ghost(instance)
+            if report.strings:
+                reloaded.append("strings")
+            if report.state:
+                reloaded.append("state")
+        if shell_paths:
+            self._reload_shell(instance, shell_dir, shell_paths)
+            reloaded.append("shell")
+        logging.info(
+            "[%s] hot reload: %s in %.2f ms",
+            ghost_id,
+            ", ".join(reloaded) or "nothing to reload",
+            (time.perf_counter() - start) * 1000,
+        )
+
+    def _reload_shell(self, instance: GhostInstance, shell_dir: Path, paths: List[Path]) -> None:
+        for path in paths:
+            self.renderer.images.invalidate(path)
+        shell = self.shell_loader.load(shell_dir, instance.manifest.shell_surfaces)
+        self.renderer.queue.replace_shell(instance.character, shell)
+
+    def _unsubscribe_ghost(self, instance: GhostInstance) -> None:
+        if instance.subscriber is None:
+            return
+        for topic in instance.topics:
+            self.signal_bus.unsubscribe(topic, instance.subscriber)
+        instance.subscriber = None
+        instance.batch_subscriber = None
+        instance.topics = []
+
+    def _close_runner(self, ghost_id: str, instance: GhostInstance) -> None:
+        close = getattr(instance.runner, "close", None)
+        if close is None:
+            self._close_save_store(ghost_id, instance.save_store)
+            return
+        instance.save_store.close()
+        self._log_save_stats(ghost_id, close())
+
+    def _close_save_store(self, ghost_id: str, save_store: SaveStore) -> None:
+        save_store.close()
+        self._log_save_stats(ghost_id, save_store.stats)
+
+    def _log_save_stats(self, ghost_id: str, stats: SaveStoreStats) -> None:
+        logging.info(
+            "[%s] save store: %d writes requested, %d flushed, %d coalesced",
+            ghost_id,
+            stats.requested,
+            stats.flushed,
+            stats.coalesced,
+        )
+
     def _dispatch_to_ghost(self, ghost_id: str, signal: WorldSignal) -> None:
         instance = self._running.get(ghost_id)
         if not instance:
             return
-        actions = instance.runner.handle_signal(signal)
+        target = signal.payload.get("target")
+        if target is not None and target != ghost_id:
+            return
+        submit = getattr(instance.runner, "submit", None)
+        if submit is not None:
+            submit(signal)
+            return
+        metrics = self.metrics
+        if metrics is not None and metrics.enabled:
+            start = time.perf_counter()
+            actions = instance.runner.handle_signal(signal)
+            metrics.record_ghost(ghost_id, signal.type, time.perf_counter() - start)
+        else:
+            actions = instance.runner.handle_signal(signal)
+        self._apply_actions(ghost_id, actions)
+
+    def _dispatch_batch_to_ghost(self, ghost_id: str, signals: List[WorldSignal]) -> None:
+        instance = self._running.get(ghost_id)
+        if not instance:
+            return
+        signals = [signal for signal in signals if signal.payload.get("target") in (None, ghost_id)]
+        if not signals:
+            return
+        submit = getattr(instance.runner, "submit", None)
+        if submit is not None:
+            for signal in signals:
+                submit(signal)
+            return
+        handle_signals = getattr(instance.runner, "handle_signals", None)
+        if handle_signals is None:
+            for signal in signals:
+                self._dispatch_to_ghost(ghost_id, signal)
+            return
+        metrics = self.metrics
+        if metrics is not None and metrics.enabled:
+            start = time.perf_counter()
+            actions = handle_signals(signals)
+            share = (time.perf_counter() - start) / len(signals)
+            for signal in signals:
+                metrics.record_ghost(ghost_id, signal.type, share)
+        else:
+            actions = handle_signals(signals)
+        self._apply_actions(ghost_id, actions)
+
+    def _apply_actions(self, ghost_id: str, actions: List[Action]) -> None:
+        instance = self._running.get(ghost_id)
+        if not instance:
+            return
+        for listener in self._action_listeners:
+            listener(ghost_id, actions)
+        surface_id: Optional[str] = None
         for action in actions:
             if action.type == "say" and action.text is not None:
-                instance.balloon.say(action.text)
+                self.renderer.queue.say(instance.balloon, action.text)
             elif action.type == "set_surface" and action.id is not None:
-                instance.character.set_surface(action.id)
+                surface_id = action.id
+            elif action.type == "set_timer" and action.id is not None:
+                self._set_ghost_timer(ghost_id, action)
+            elif action.type == "cancel_timer" and action.id is not None:
+                if self.scheduler is not None:
+                    self.scheduler.cancel_timer(f"{ghost_id}:{action.id}")
             elif action.type == "noop":
                 continue
+        if surface_id is not None:
+            self.renderer.queue.set_surface(instance.character, surface_id)
+
+    def _set_ghost_timer(self, ghost_id: str, action: Action) -> None:
+        if self.scheduler is None:
+            logging.warning("Ghost %s requested timer %s but no scheduler is running", ghost_id, action.id)
+            return
+        params = dict(action.params or {})
+        event = params.pop("event", f"ghost.timer.{action.id}")
+        timer_id = action.id
+
+        def _fire(now: datetime) -> None:
+            payload = {"type": event, "timer": timer_id, "target": ghost_id, "time": now.isoformat()}
+            self.signal_bus.publish(WorldSignal(type=event, payload=payload))
+
+        try:
+            self.scheduler.add_timer(f"{ghost_id}:{timer_id}", _fire, owner=ghost_id, **params)
+        except (TypeError, ValueError) as exc:
+            logging.warning("Ghost %s set an invalid timer %s: %s", ghost_id, timer_id, exc)
+
+    def _parse_manifest_entry(
+        self, item: Tuple[str, Path, os.stat_result]
+    ) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+        folder_name, manifest_path, stat = item
+        try:
+            if is_archive(manifest_path):
+                manifest = self._load_manifest(open_archive(manifest_path).root / "manifest.json")
+            else:
+                manifest = self._load_manifest(manifest_path)
+        except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile) as exc:
+            return folder_name, None, f"{type(exc).__name__}: {exc}"
+        entry = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "manifest": asdict(manifest)}
+        return folder_name, entry, None
+
+    def _read_manifest_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            data = json.loads(self.manifest_index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != self.MANIFEST_INDEX_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def _write_manifest_index(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        path = self.manifest_index_path
+        payload = {"version": self.MANIFEST_INDEX_VERSION, "entries": entries}
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f".{path.name}.tmp")
+            temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, path)
+        except OSError:
+            logging.exception("Failed to write manifest index %s", path)
 
     def _load_manifest(self, manifest_path: Path) -> GhostManifest:
         data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        ghost_id = data["id"]
+        if not isinstance(ghost_id, str) or ghost_id in ("", ".") or any(part in ghost_id for part in ("..", "/", "\\")):
+            raise ValueError(f"Invalid ghost id: {ghost_id!r}")
         return GhostManifest(
-            id=data["id"],
+            id=ghost_id,
             name=data["name"],
             version=data["version"],
             author=data["author"],
@@ -151,12 +663,15 @@ class GhostManager:
 
         return _on_click
 
-    def _publish_presence(self) -> None:
+    def presence_signal(self) -> WorldSignal:
         payload = {
             "type": "world.presence.changed",
             "running": self.presence.snapshot(),
         }
-        self.signal_bus.publish(WorldSignal(type="world.presence.changed", payload=payload))
+        return WorldSignal(type="world.presence.changed", payload=payload)
+
+    def _publish_presence(self) -> None:
+        self.signal_bus.publish(self.presence_signal())
 
     def _load_balloon_style(self, manifest: GhostManifest) -> Optional[dict]:
         balloon_path = self.baseware_root / "balloons" / manifest.balloon_default / "balloon.json"
@@ -165,6 +680,20 @@ class GhostManager:
         return json.loads(balloon_path.read_text(encoding="utf-8")).get("style")
 
     def _create_runner(self, manifest: GhostManifest, ghost_dir: Path, save_store: SaveStore):
+        if manifest.entry_type == "yaml" and self.runner_pool is not None:
+            return self.runner_pool.open(
+                manifest.id,
+                ghost_dir,
+                save_store.save_path,
+                write_behind=self.write_behind_saves,
+                cache_dir=self.baseware_root / "runtime" / "cache",
+            )
         if manifest.entry_type == "yaml":
-            return YamlGhostRunner(manifest.id, ghost_dir, save_store)
+            return YamlGhostRunner(
+                manifest.id,
+                ghost_dir,
+                save_store,
+                metrics=self.metrics,
+                cache_dir=self.baseware_root / "runtime" / "cache",
+            )
         return GhostRunnerStub(manifest.id)
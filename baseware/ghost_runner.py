@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Iterable
+
 from baseware.models import Action, WorldSignal
 
 
@@ -7,9 +9,18 @@ class GhostRunnerStub:
     def __init__(self, ghost_id: str) -> None:
         self.ghost_id = ghost_id
 
+    def topics(self) -> list[str]:
+        return ["#"]
+
     def handle_signal(self, signal: WorldSignal) -> list[Action]:
         message = f"（stub）收到 {signal.type} 了"
         return [
             Action(type="say", text=message),
             Action(type="set_surface", id="smile"),
         ]
+
+    def handle_signals(self, signals: Iterable[WorldSignal]) -> list[Action]:
+        actions: list[Action] = []
+        for signal in signals:
+            actions.extend(self.handle_signal(signal))
+        return actions
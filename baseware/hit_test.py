@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Hitbox:
+    id: str
+    x: int
+    y: int
+    w: int
+    h: int
+
+
+class HitboxGrid:
+    MAX_CELLS_PER_AXIS = 64
+
+    def __init__(self, hitboxes: Sequence[Hitbox], cell_size: Optional[int] = None) -> None:
+        self.hitboxes: Tuple[Hitbox, ...] = tuple(hitboxes)
+        self._cells: Tuple[Tuple[int, ...], ...] = ()
+        self._cols = 0
+        self._rows = 0
+        self._min_x = self._min_y = 0
+        self._max_x = self._max_y = -1
+        self.cell_size = 1
+        if self.hitboxes:
+            self._build(cell_size)
+
+    def _build(self, cell_size: Optional[int]) -> None:
+        self._min_x = min(hitbox.x for hitbox in self.hitboxes)
+        self._min_y = min(hitbox.y for hitbox in self.hitboxes)
+        self._max_x = max(hitbox.x + hitbox.w for hitbox in self.hitboxes)
+        self._max_y = max(hitbox.y + hitbox.h for hitbox in self.hitboxes)
+        width = self._max_x - self._min_x + 1
+        height = self._max_y - self._min_y + 1
+        if cell_size is None:
+            cell_size = max(1, int(math.sqrt(width * height / len(self.hitboxes))))
+        cell_size = max(
+            cell_size,
+            math.ceil(width / self.MAX_CELLS_PER_AXIS),
+            math.ceil(height / self.MAX_CELLS_PER_AXIS),
+        )
+        self.cell_size = cell_size
+        self._cols = (width - 1) // cell_size + 1
+        self._rows = (height - 1) // cell_size + 1
+        buckets: List[List[int]] = [[] for _ in range(self._cols * self._rows)]
+        for index, hitbox in enumerate(self.hitboxes):
+            first_col = (hitbox.x - self._min_x) // cell_size
+            last_col = (hitbox.x + hitbox.w - self._min_x) // cell_size
+            first_row = (hitbox.y - self._min_y) // cell_size
+            last_row = (hitbox.y + hitbox.h - self._min_y) // cell_size
+            for row in range(first_row, last_row + 1):
+                offset = row * self._cols
+                for col in range(first_col, last_col + 1):
+                    buckets[offset + col].append(index)
+        self._cells = tuple(tuple(bucket) for bucket in buckets)
+
+    def hit(self, x: int, y: int) -> Optional[Hitbox]:
+        if x < self._min_x or x > self._max_x or y < self._min_y or y > self._max_y:
+            return None
+        cell = ((y - self._min_y) // self.cell_size) * self._cols + (x - self._min_x) // self.cell_size
+        for index in self._cells[cell]:
+            hitbox = self.hitboxes[index]
+            if hitbox.x <= x <= hitbox.x + hitbox.w and hitbox.y <= y <= hitbox.y + hitbox.h:
+                return hitbox
+        return None
+
+    def hit_many(self, points: Iterable[Tuple[int, int]]) -> List[Optional[Hitbox]]:
+        hit = self.hit
+        return [hit(x, y) for x, y in points]
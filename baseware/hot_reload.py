@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+Snapshot = Dict[Path, Tuple[int, int]]
+ChangeCallback = Callable[[str, List[Path]], None]
+PathFilter = Callable[[Path], bool]
+
+
+@dataclass
+class _Watch:
+    roots: List[Path]
+    callback: ChangeCallback
+    include: Optional[PathFilter]
+    snapshot: Snapshot = field(default_factory=dict)
+
+
+class GhostWatcher:
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._watches: Dict[str, _Watch] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def watch(
+        self,
+        ghost_id: str,
+        roots: List[Path],
+        callback: ChangeCallback,
+        include: Optional[PathFilter] = None,
+    ) -> None:
+        watch = _Watch(roots=list(roots), callback=callback, include=include)
+        watch.snapshot = self._snapshot(watch)
+        with self._lock:
+            self._watches[ghost_id] = watch
+
+    def unwatch(self, ghost_id: str) -> None:
+        with self._lock:
+            self._watches.pop(ghost_id, None)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ghost-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+
+    def poll(self) -> Dict[str, List[Path]]:
+        with self._lock:
+            watches = list(self._watches.items())
+        changes: Dict[str, List[Path]] = {}
+        for ghost_id, watch in watches:
+            snapshot = self._snapshot(watch)
+            previous = watch.snapshot
+            watch.snapshot = snapshot
+            changed = [path for path, signature in snapshot.items() if previous.get(path) != signature]
+            changed.extend(path for path in previous if path not in snapshot)
+            if not changed:
+                continue
+            changes[ghost_id] = sorted(changed)
+            try:
+                watch.callback(ghost_id, changes[ghost_id])
+            except Exception:
+                logging.exception("Hot reload failed for %s", ghost_id)
+        return changes
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(timeout=self.interval):
+            self.poll()
+
+    @staticmethod
+    def _snapshot(watch: _Watch) -> Snapshot:
+        snapshot: Snapshot = {}
+        pending = [str(root) for root in watch.roots]
+        while pending:
+            directory = pending.pop()
+            try:
+                entries = os.scandir(directory)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    path = Path(entry.path)
+                    if watch.include is not None and not watch.include(path):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import io
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+
+ImageReader = Callable[[Path], Union[bytes, memoryview]]
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class DecodedImage:
+    width: int
+    height: int
+    mode: str
+    data: bytes = field(repr=False)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+
+@dataclass
+class ImageCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    prefetched: int = 0
+    failures: int = 0
+    bytes: int = 0
+
+
+def decode_image(data: Union[bytes, memoryview]) -> DecodedImage:
+    if Image is not None:
+        with Image.open(io.BytesIO(data)) as image:
+            rgba = image.convert("RGBA")
+            return DecodedImage(width=rgba.width, height=rgba.height, mode="RGBA", data=rgba.tobytes())
+    if data[:8] != PNG_SIGNATURE or data[12:16] != b"IHDR":
+        raise ValueError("not a PNG image")
+    width, height = struct.unpack(">II", data[16:24])
+    return DecodedImage(width=width, height=height, mode="PNG", data=bytes(data))
+
+
+class SurfaceImageCache:
+    def __init__(self, budget_bytes: int = 64 * 1024 * 1024, workers: int = 2) -> None:
+        self.budget_bytes = budget_bytes
+        self.stats = ImageCacheStats()
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Path, Optional[DecodedImage]]" = OrderedDict()
+        self._pending: Dict[Path, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-decode")
+
+    def get(self, path: Path, reader: Optional[ImageReader] = None) -> Optional[DecodedImage]:
+        with self._lock:
+            if path in self._entries:
+                self._entries.move_to_end(path)
+                self.stats.hits += 1
+                return self._entries[path]
+            pending = self._pending.get(path)
+            self.stats.misses += 1
+        if pending is not None:
+            return pending.result()
+        return self._load(path, reader)
+
+    def prefetch(self, paths: Iterable[Path], reader: Optional[ImageReader] = None) -> None:
+        with self._lock:
+            for path in paths:
+                if path in self._entries or path in self._pending:
+                    continue
+                self._pending[path] = self._executor.submit(self._load, path, reader)
+                self.stats.prefetched += 1
+
+    def contains(self, path: Path) -> bool:
+        with self._lock:
+            return path in self._entries
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            image = self._entries.pop(path, None)
+            if image is not None:
+                self.stats.bytes -= image.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = 0
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def _load(self, path: Path, reader: Optional[ImageReader] = None) -> Optional[DecodedImage]:
+        image: Optional[DecodedImage]
+        try:
+            image = decode_image((reader or Path.read_bytes)(path))
+        except (OSError, ValueError) as exc:
+            logging.warning("Could not decode surface image %s: %s", path, exc)
+            image = None
+        with self._lock:
+            self._pending.pop(path, None)
+            if image is None:
+                self.stats.failures += 1
+            elif image.nbytes > self.budget_bytes:
+                return image
+            self._store(path, image)
+        return image
+
+    def _store(self, path: Path, image: Optional[DecodedImage]) -> None:
+        previous = self._entries.pop(path, None)
+        if previous is not None:
+            self.stats.bytes -= previous.nbytes
+        self._entries[path] = image
+        if image is not None:
+            self.stats.bytes += image.nbytes
+        while self.stats.bytes > self.budget_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            if evicted is not None:
+                self.stats.bytes -= evicted.nbytes
+            self.stats.evictions += 1
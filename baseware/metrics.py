@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+
+LATENCY_BUCKETS_US = (10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_US) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        micros = seconds * 1_000_000
+        for index, bound in enumerate(LATENCY_BUCKETS_US):
+            if micros <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={bound}us" for bound in LATENCY_BUCKETS_US] + [f">{LATENCY_BUCKETS_US[-1]}us"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_us": round(self.total / self.count * 1_000_000, 1) if self.count else 0.0,
+            "max_us": round(self.max * 1_000_000, 1),
+            "buckets": {label: hits for label, hits in zip(labels, self.buckets) if hits},
+        }
+
+
+class Metrics:
+    def __init__(self, enabled: bool = False, slow_threshold: float = 0.05) -> None:
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self._lock = threading.Lock()
+        self._groups: Dict[str, Dict[str, LatencyHistogram]] = {
+            "publish": {},
+            "subscribers": {},
+            "ghosts": {},
+            "events": {},
+        }
+        self.slow_handlers = 0
+
+    def record_publish(self, signal_type: str, seconds: float) -> None:
+        self._record("publish", signal_type, seconds)
+
+    def record_subscriber(self, name: str, seconds: float) -> None:
+        self._record("subscribers", name, seconds)
+
+    def record_ghost(self, ghost_id: str, signal_type: str, seconds: float) -> None:
+        self._record("ghosts", ghost_id, seconds)
+        if seconds >= self.slow_threshold:
+            self.slow_handlers += 1
+            logging.warning("Slow handler: ghost %s took %.1f ms for %s", ghost_id, seconds * 1000, signal_type)
+
+    def record_event(self, ghost_id: str, source: str, seconds: float) -> None:
+        self._record("events", f"{ghost_id}/{source}", seconds)
+        if seconds >= self.slow_threshold:
+            logging.warning("Slow event: ghost %s event %s took %.1f ms", ghost_id, source, seconds * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            groups = {
+                group: {key: histogram.to_dict() for key, histogram in sorted(entries.items())}
+                for group, entries in self._groups.items()
+            }
+        return {
+            "captured_at": datetime.now().astimezone().isoformat(),
+            "enabled": self.enabled,
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "slow_handlers": self.slow_handlers,
+            **groups,
+        }
+
+    def export(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.tmp")
+        temp_path.write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(temp_path, path)
+        return path
+
+    def reset(self) -> None:
+        with self._lock:
+            for entries in self._groups.values():
+                entries.clear()
+            self.slow_handlers = 0
+
+    def _record(self, group: str, key: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._groups[group].get(key)
+            if histogram is None:
+                histogram = self._groups[group][key] = LatencyHistogram()
+            histogram.record(seconds)
@@ -2,30 +2,50 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
 
+from baseware.hit_test import Hitbox, HitboxGrid
+from baseware.symbols import intern
 
-@dataclass(frozen=True)
-class Hitbox:
-    id: str
-    x: int
-    y: int
-    w: int
-    h: int
+if TYPE_CHECKING:
+    from baseware.shell_pack import ShellPack
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Surface:
     id: str
     file: Optional[str]
-    hitboxes: List[Hitbox]
+    hit_index: HitboxGrid = field(repr=False, compare=False)
+
+    @property
+    def hitboxes(self) -> Tuple[Hitbox, ...]:
+        return self.hit_index.hitboxes
 
 
 @dataclass(frozen=True)
 class ShellDefinition:
     default_surface: str
-    surfaces: Dict[str, Surface]
+    surfaces: Mapping[str, Surface]
     bubble_offset: Optional[tuple[int, int]] = None
+    root: Optional[Path] = None
+    pack: Optional["ShellPack"] = None
+
+    def surface_path(self, surface_id: str) -> Optional[Path]:
+        surface = self.surfaces.get(surface_id)
+        if surface is None or not surface.file or self.root is None:
+            return None
+        return self.root / surface.file
+
+    def read_asset(self, path: Path) -> Union[bytes, memoryview]:
+        if self.pack is not None and self.root is not None:
+            data = self.pack.get(path.relative_to(self.root).as_posix())
+            if data is not None:
+                return data
+        read_buffer = getattr(path, "read_buffer", None)
+        if read_buffer is not None:
+            return read_buffer()
+        return path.read_bytes()
 
 
 @dataclass(frozen=True)
@@ -42,17 +62,42 @@ class GhostManifest:
     storage_path: str
 
 
-@dataclass(frozen=True)
+class FrozenPayload(dict):
+    __slots__ = ()
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> None:
+        raise TypeError("Signal payloads are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self) -> tuple:
+        return (FrozenPayload, (dict(self),))
+
+
+def freeze_payload(payload: Mapping[str, Any]) -> FrozenPayload:
+    if type(payload) is FrozenPayload:
+        return payload
+    return FrozenPayload(payload)
+
+
+@dataclass(frozen=True, slots=True)
 class WorldSignal:
     type: str
-    payload: Dict[str, Any]
+    payload: Mapping[str, Any]
 
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "type", intern(self.type))
+        if type(self.payload) is not FrozenPayload:
+            object.__setattr__(self, "payload", FrozenPayload(self.payload))
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Action:
     type: str
     text: Optional[str] = None
     id: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
 
 
 @dataclass
@@ -64,6 +109,7 @@ class PresenceRegistry:
 
 
 Subscriber = Callable[[WorldSignal], None]
+BatchSubscriber = Callable[[List[WorldSignal]], None]
 
 
 @dataclass(frozen=True)
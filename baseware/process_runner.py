@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import logging
+import marshal
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from baseware.archive_fs import resolve_path
+from baseware.models import Action, WorldSignal
+from baseware.save_store import SaveStore, SaveStoreStats
+from baseware.yaml_runtime import ReloadReport, YamlGhostRunner
+
+ActionCallback = Callable[[str, List[Action]], None]
+ActionRecord = Tuple[str, Optional[str], Optional[str], Optional[Dict[str, Any]]]
+
+OP_OPEN = "open"
+OP_BATCH = "batch"
+OP_RELOAD = "reload"
+OP_CLOSE = "close"
+OP_FLUSH = "flush"
+OP_STOP = "stop"
+
+
+def encode_actions(actions: Iterable[Action]) -> List[ActionRecord]:
+    return [(action.type, action.text, action.id, action.params) for action in actions]
+
+
+def decode_actions(records: Iterable[ActionRecord]) -> List[Action]:
+    return [Action(type=kind, text=text, id=action_id, params=params) for kind, text, action_id, params in records]
+
+
+def _worker_main(conn: Any) -> None:
+    runners: Dict[str, YamlGhostRunner] = {}
+    while True:
+        try:
+            op, args = marshal.loads(conn.recv_bytes())
+        except (EOFError, OSError):
+            break
+        try:
+            if op == OP_BATCH:
+                result: Any = _run_batch(runners, args)
+            elif op == OP_OPEN:
+                result = _open_runner(runners, *args)
+            elif op == OP_RELOAD:
+                ghost_id, paths = args
+                runner = runners[ghost_id]
+                report = runner.reload([Path(path) for path in paths])
+                result = (report.events, report.strings, report.state, report.elapsed, runner.topics())
+            elif op == OP_FLUSH:
+                runner = runners.get(args)
+                if runner is not None:
+                    runner.save_store.flush()
+                result = None
+            elif op == OP_CLOSE:
+                runner = runners.pop(args, None)
+                stats = SaveStoreStats()
+                if runner is not None:
+                    runner.save_store.close()
+                    stats = runner.save_store.stats
+                result = (stats.requested, stats.flushed, stats.coalesced)
+            elif op == OP_STOP:
+                for runner in runners.values():
+                    runner.save_store.close()
+                conn.send_bytes(marshal.dumps((True, None)))
+                break
+            else:
+                raise ValueError(f"Unknown worker op: {op}")
+            conn.send_bytes(marshal.dumps((True, result)))
+        except Exception as exc:
+            conn.send_bytes(marshal.dumps((False, (type(exc).__name__, str(exc)))))
+
+
+def _open_runner(
+    runners: Dict[str, YamlGhostRunner],
+    ghost_id: str,
+    ghost_dir: str,
+    save_path: str,
+    write_behind: bool,
+    cache_dir: Optional[str],
+) -> Tuple[List[str], List[str]]:
+    save_store = SaveStore(Path(save_path), write_behind=write_behind)
+    save_store.ensure_initialized()
+    runner = YamlGhostRunner(
+        ghost_id,
+        resolve_path(ghost_dir),
+        save_store,
+        cache_dir=Path(cache_dir) if cache_dir else None,
+    )
+    runners[ghost_id] = runner
+    return runner.topics(), runner.surface_ids()
+
+
+def _run_batch(
+    runners: Dict[str, YamlGhostRunner],
+    batch: List[Tuple[str, str, Dict[str, Any]]],
+) -> List[Tuple[str, List[ActionRecord]]]:
+    signals: Dict[str, List[WorldSignal]] = {}
+    for ghost_id, signal_type, payload in batch:
+        signals.setdefault(ghost_id, []).append(WorldSignal(type=signal_type, payload=payload))
+    results: List[Tuple[str, List[ActionRecord]]] = []
+    for ghost_id, ghost_signals in signals.items():
+        runner = runners.get(ghost_id)
+        if runner is None:
+            continue
+        try:
+            actions = runner.handle_signals(ghost_signals)
+        except Exception:
+            logging.exception("Ghost %s failed on a batch of %d signal(s)", ghost_id, len(ghost_signals))
+            continue
+        if actions:
+            results.append((ghost_id, encode_actions(actions)))
+    return results
+
+
+def _raise_remote(error: Tuple[str, str]) -> None:
+    name, message = error
+    if name == "ValueError":
+        raise ValueError(message)
+    raise RuntimeError(f"{name}: {message}")
+
+
+@dataclass
+class _OpenArgs:
+    ghost_dir: str
+    save_path: str
+    write_behind: bool
+    cache_dir: Optional[str]
+
+
+@dataclass
+class WorkerStats:
+    batches: int = 0
+    signals: int = 0
+    restarts: int = 0
+    dropped: int = 0
+
+
+class _Worker:
+    def __init__(self, index: int, on_actions: ActionCallback, max_batch: int) -> None:
+        self.index = index
+        self.on_actions = on_actions
+        self.max_batch = max_batch
+        self.ghosts: Dict[str, _OpenArgs] = {}
+        self.stats = WorkerStats()
+        self._call_lock = threading.Lock()
+        self._batch_lock = threading.Lock()
+        self._condition = threading.Condition()
+        self._pending: Deque[Tuple[str, str, Dict[str, Any]]] = deque()
+        self._closed = False
+        self._process: Any = None
+        self._conn: Any = None
+        self._spawn()
+        self._thread = threading.Thread(target=self._run, name=f"ghost-worker-{index}", daemon=True)
+        self._thread.start()
+
+    def submit(self, ghost_id: str, signal: WorldSignal) -> None:
+        with self._condition:
+            self._pending.append((ghost_id, signal.type, dict(signal.payload)))
+            self._condition.notify()
+
+    def call(self, op: str, args: Any) -> Any:
+        with self._call_lock:
+            for attempt in range(2):
+                try:
+                    self._conn.send_bytes(marshal.dumps((op, args)))
+                    ok, result = marshal.loads(self._conn.recv_bytes())
+                    break
+                except (EOFError, OSError):
+                    if attempt or op in (OP_CLOSE, OP_STOP):
+                        raise
+                    self._restart()
+        if not ok:
+            _raise_remote(result)
+        return result
+
+    def open(self, ghost_id: str, args: _OpenArgs) -> Tuple[List[str], List[str]]:
+        result = self.call(OP_OPEN, (ghost_id, args.ghost_dir, args.save_path, args.write_behind, args.cache_dir))
+        self.ghosts[ghost_id] = args
+        return result
+
+    def close(self, ghost_id: str) -> SaveStoreStats:
+        with self._batch_lock:
+            with self._condition:
+                remaining = [item for item in self._pending if item[0] == ghost_id]
+                self._pending = deque(item for item in self._pending if item[0] != ghost_id)
+            for start in range(0, len(remaining), self.max_batch):
+                self._deliver(remaining[start : start + self.max_batch])
+            self.ghosts.pop(ghost_id, None)
+        try:
+            requested, flushed, coalesced = self.call(OP_CLOSE, ghost_id)
+        except (EOFError, OSError):
+            return SaveStoreStats()
+        return SaveStoreStats(requested=requested, flushed=flushed, coalesced=coalesced)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        try:
+            self.call(OP_STOP, None)
+        except (EOFError, OSError):
+            pass
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+
+    def _spawn(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_worker_main,
+            args=(child_conn,),
+            name=f"ghost-worker-{self.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._process = process
+        self._conn = parent_conn
+
+    def _restart(self) -> None:
+        self._conn.close()
+        self._process.join(timeout=1)
+        logging.warning(
+            "Ghost worker %d exited with code %s; restarting with %d ghost(s)",
+            self.index,
+            self._process.exitcode,
+            len(self.ghosts),
+        )
+        self.stats.restarts += 1
+        self._spawn()
+        for ghost_id, args in list(self.ghosts.items()):
+            self._conn.send_bytes(
+                marshal.dumps((OP_OPEN, (ghost_id, args.ghost_dir, args.save_path, args.write_behind, args.cache_dir)))
+            )
+            ok, result = marshal.loads(self._conn.recv_bytes())
+            if not ok:
+                logging.error("Ghost %s failed to reopen after restart: %s", ghost_id, result)
+                self.ghosts.pop(ghost_id, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+            with self._batch_lock:
+                with self._condition:
+                    count = min(len(self._pending), self.max_batch)
+                    batch = [self._pending.popleft() for _ in range(count)]
+                if batch:
+                    self._deliver(batch)
+
+    def _deliver(self, batch: List[Tuple[str, str, Dict[str, Any]]]) -> None:
+        try:
+            results = self._send_batch(batch)
+        except Exception:
+            logging.exception("Ghost worker %d dropped a batch of %d signal(s)", self.index, len(batch))
+            self.stats.dropped += len(batch)
+            return
+        if results is None:
+            return
+        self.stats.batches += 1
+        self.stats.signals += len(batch)
+        for ghost_id, records in results:
+            if ghost_id not in self.ghosts:
+                continue
+            try:
+                self.on_actions(ghost_id, decode_actions(records))
+            except Exception:
+                logging.exception("Applying actions for %s failed", ghost_id)
+
+    def _send_batch(
+        self, batch: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> Optional[List[Tuple[str, List[ActionRecord]]]]:
+        with self._call_lock:
+            try:
+                self._conn.send_bytes(marshal.dumps((OP_BATCH, batch)))
+                ok, result = marshal.loads(self._conn.recv_bytes())
+            except (EOFError, OSError):
+                self.stats.dropped += len(batch)
+                self._restart()
+                return None
+        if not ok:
+            _raise_remote(result)
+        return result
+
+
+class ProcessGhostRunner:
+    def __init__(
+        self,
+        ghost_id: str,
+        worker: _Worker,
+        topics: List[str],
+        surface_ids: List[str],
+    ) -> None:
+        self.ghost_id = ghost_id
+        self.worker = worker
+        self._topics = topics
+        self._surface_ids = surface_ids
+
+    def topics(self) -> list[str]:
+        return list(self._topics)
+
+    def surface_ids(self) -> list[str]:
+        return list(self._surface_ids)
+
+    def submit(self, signal: WorldSignal) -> None:
+        self.worker.submit(self.ghost_id, signal)
+
+    def handle_signal(self, signal: WorldSignal) -> list[Action]:
+        results = self.worker.call(OP_BATCH, [(self.ghost_id, signal.type, dict(signal.payload))])
+        return [action for _, records in results for action in decode_actions(records)]
+
+    def reload(self, paths: Iterable[Path]) -> ReloadReport:
+        events, strings, state, elapsed, topics = self.worker.call(
+            OP_RELOAD, (self.ghost_id, [str(path) for path in paths])
+        )
+        self._topics = topics
+        return ReloadReport(events=events, strings=strings, state=state, elapsed=elapsed)
+
+    def flush_saves(self) -> None:
+        self.worker.call(OP_FLUSH, self.ghost_id)
+
+    def close(self) -> SaveStoreStats:
+        return self.worker.close(self.ghost_id)
+
+
+class RunnerPool:
+    def __init__(self, on_actions: ActionCallback, workers: Optional[int] = None, max_batch: int = 64) -> None:
+        self.on_actions = on_actions
+        self.size = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self._lock = threading.Lock()
+        self._workers: List[_Worker] = []
+
+    def open(
+        self,
+        ghost_id: str,
+        ghost_dir: Path,
+        save_path: Path,
+        write_behind: bool = True,
+        cache_dir: Optional[Path] = None,
+    ) -> ProcessGhostRunner:
+        worker = self._assign()
+        start = time.perf_counter()
+        args = _OpenArgs(str(ghost_dir), str(save_path), write_behind, str(cache_dir) if cache_dir else None)
+        topics, surface_ids = worker.open(ghost_id, args)
+        logging.info(
+            "[%s] runner started in worker %d (%.1f ms)",
+            ghost_id,
+            worker.index,
+            (time.perf_counter() - start) * 1000,
+        )
+        return ProcessGhostRunner(ghost_id, worker, topics, surface_ids)
+
+    def stats(self) -> Dict[int, WorkerStats]:
+        with self._lock:
+            return {worker.index: worker.stats for worker in self._workers}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def _assign(self) -> _Worker:
+        with self._lock:
+            idle = [worker for worker in self._workers if not worker.ghosts]
+            if idle:
+                return idle[0]
+            if len(self._workers) < self.size:
+                worker = _Worker(len(self._workers), self.on_actions, self.max_batch)
+                self._workers.append(worker)
+                return worker
+            return min(self._workers, key=lambda worker: len(worker.ghosts))
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
-from baseware.models import ShellDefinition
+from baseware.image_cache import DecodedImage, SurfaceImageCache
+from baseware.models import Hitbox, ShellDefinition
 
 
 @dataclass
@@ -13,23 +17,46 @@ class CharacterWindow:
     shell: ShellDefinition
     on_click: Callable[[str, int, int, str], None]
     current_surface: str
+    images: Optional[SurfaceImageCache] = None
+    current_image: Optional[DecodedImage] = None
 
     def set_surface(self, surface_id: str) -> None:
         if surface_id not in self.shell.surfaces:
             logging.warning("Unknown surface: %s", surface_id)
             return
         self.current_surface = surface_id
+        self.current_image = self._load_image(surface_id)
         logging.info("[%s] surface -> %s", self.ghost_id, surface_id)
 
+    def _load_image(self, surface_id: str) -> Optional[DecodedImage]:
+        if self.images is None:
+            return None
+        path = self.shell.surface_path(surface_id)
+        if path is None:
+            return None
+        return self.images.get(path, self.shell.read_asset)
+
+    def hit_test(self, x: int, y: int) -> Optional[Hitbox]:
+        surface = self.shell.surfaces.get(self.current_surface)
+        if not surface:
+            return None
+        return surface.hit_index.hit(x, y)
+
+    def hit_test_many(self, points: Iterable[Tuple[int, int]]) -> List[Optional[str]]:
+        surface = self.shell.surfaces.get(self.current_surface)
+        if not surface:
+            return [None for _ in points]
+        return [hitbox.id if hitbox else None for hitbox in surface.hit_index.hit_many(points)]
+
     def simulate_click(self, x: int, y: int, button: str = "left") -> None:
         surface = self.shell.surfaces.get(self.current_surface)
         if not surface:
             logging.warning("No surface for click on %s", self.ghost_id)
             return
-        for hitbox in surface.hitboxes:
-            if hitbox.x <= x <= hitbox.x + hitbox.w and hitbox.y <= y <= hitbox.y + hitbox.h:
-                self.on_click(hitbox.id, x, y, button)
-                return
+        hitbox = surface.hit_index.hit(x, y)
+        if hitbox is not None:
+            self.on_click(hitbox.id, x, y, button)
+            return
         logging.info("[%s] click miss (%s,%s)", self.ghost_id, x, y)
 
 
@@ -42,9 +69,151 @@ class BalloonWindow:
     def say(self, text: str) -> None:
         logging.info("[%s] says: %s", self.ghost_id, text)
 
+    def say_many(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            logging.info("[%s] says: %s", self.ghost_id, text)
+
+
+@dataclass
+class RenderStats:
+    frames: int = 0
+    surfaces_requested: int = 0
+    surfaces_applied: int = 0
+    lines_requested: int = 0
+    lines_shown: int = 0
+    balloon_repaints: int = 0
+
+    @property
+    def coalesced(self) -> int:
+        return self.surfaces_requested - self.surfaces_applied + self.lines_shown - self.balloon_repaints
+
+
+class RenderQueue:
+    def __init__(self, frame_interval: float = 1 / 60, say_interval: float = 0.0) -> None:
+        if frame_interval <= 0:
+            raise ValueError(f"Frame interval must be positive, got {frame_interval}")
+        if say_interval < 0:
+            raise ValueError(f"Balloon cadence must not be negative, got {say_interval}")
+        self.frame_interval = frame_interval
+        self.say_interval = say_interval
+        self.stats = RenderStats()
+        self._lock = threading.Lock()
+        # Serialises frames so updates taken in one frame are applied before the next frame takes any.
+        self._render_lock = threading.Lock()
+        self._surfaces: Dict[str, Tuple[CharacterWindow, str]] = {}
+        self._lines: Dict[str, Tuple[BalloonWindow, Deque[str]]] = {}
+        self._next_line_at: Dict[str, float] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def set_surface(self, character: CharacterWindow, surface_id: str) -> None:
+        with self._lock:
+            self._surfaces[character.ghost_id] = (character, surface_id)
+            self.stats.surfaces_requested += 1
+
+    def say(self, balloon: BalloonWindow, text: str) -> None:
+        with self._lock:
+            entry = self._lines.get(balloon.ghost_id)
+            if entry is None or entry[0] is not balloon:
+                entry = self._lines[balloon.ghost_id] = (balloon, deque())
+            entry[1].append(text)
+            self.stats.lines_requested += 1
+
+    def replace_shell(self, character: CharacterWindow, shell: ShellDefinition) -> None:
+        # Swapped under the frame lock so a frame in flight never applies a surface against the wrong shell.
+        with self._render_lock:
+            character.shell = shell
+            surface_id = character.current_surface if character.current_surface in shell.surfaces else shell.default_surface
+            character.set_surface(surface_id)
+
+    def discard(self, ghost_id: str) -> None:
+        with self._lock:
+            self._surfaces.pop(ghost_id, None)
+            self._lines.pop(ghost_id, None)
+            self._next_line_at.pop(ghost_id, None)
+
+    def tick(self, now: Optional[float] = None) -> int:
+        return self._render(time.monotonic() if now is None else now, paced=True)
+
+    def flush(self) -> int:
+        return self._render(time.monotonic(), paced=False)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="render-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.flush()
+        stats = self.stats
+        if stats.frames:
+            logging.info(
+                "Render queue: %d frame(s), %d/%d surface update(s) applied, %d line(s) in %d balloon repaint(s), %d coalesced",
+                stats.frames,
+                stats.surfaces_applied,
+                stats.surfaces_requested,
+                stats.lines_shown,
+                stats.balloon_repaints,
+                stats.coalesced,
+            )
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.frame_interval):
+            try:
+                self.tick()
+            except Exception:
+                logging.exception("Render frame failed")
+
+    def _render(self, now: float, paced: bool) -> int:
+        with self._render_lock:
+            with self._lock:
+                surfaces = list(self._surfaces.values())
+                self._surfaces.clear()
+                lines = self._take_lines(now, paced)
+                if not surfaces and not lines:
+                    return 0
+                self.stats.frames += 1
+                self.stats.surfaces_applied += len(surfaces)
+                self.stats.balloon_repaints += len(lines)
+                self.stats.lines_shown += sum(len(texts) for _, texts in lines)
+            for character, surface_id in surfaces:
+                character.set_surface(surface_id)
+            for balloon, texts in lines:
+                balloon.say_many(texts)
+            return len(surfaces) + len(lines)
+
+    def _take_lines(self, now: float, paced: bool) -> List[Tuple[BalloonWindow, List[str]]]:
+        taken: List[Tuple[BalloonWindow, List[str]]] = []
+        for ghost_id, (balloon, queue) in list(self._lines.items()):
+            if paced and self.say_interval > 0:
+                if now < self._next_line_at.get(ghost_id, 0.0):
+                    continue
+                texts = [queue.popleft()]
+                self._next_line_at[ghost_id] = now + self.say_interval
+            else:
+                texts = list(queue)
+                queue.clear()
+            if not queue:
+                del self._lines[ghost_id]
+            taken.append((balloon, texts))
+        return taken
+
 
 class Renderer:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        images: Optional[SurfaceImageCache] = None,
+        frame_interval: float = 1 / 60,
+        say_interval: float = 0.0,
+    ) -> None:
+        self.images = images or SurfaceImageCache()
+        self.queue = RenderQueue(frame_interval=frame_interval, say_interval=say_interval)
         self._characters: dict[str, CharacterWindow] = {}
         self._balloons: dict[str, BalloonWindow] = {}
 
@@ -54,15 +223,35 @@ class Renderer:
             shell=shell,
             on_click=on_click,
             current_surface=shell.default_surface,
+            images=self.images,
         )
         self._characters[ghost_id] = character
         return character
 
+    def prefetch_surfaces(self, ghost_id: str, surface_ids: Iterable[str]) -> None:
+        character = self._characters.get(ghost_id)
+        if character is None:
+            return
+        paths = [character.shell.surface_path(surface_id) for surface_id in surface_ids]
+        self.images.prefetch((path for path in paths if path is not None), character.shell.read_asset)
+
     def create_balloon(self, ghost_id: str, style: Optional[dict], offset: Optional[tuple[int, int]] = None) -> BalloonWindow:
         balloon = BalloonWindow(ghost_id=ghost_id, style=style, offset=offset)
         self._balloons[ghost_id] = balloon
         return balloon
 
+    def start(self) -> None:
+        self.queue.start()
+
+    def flush(self) -> int:
+        return self.queue.flush()
+
     def close(self, ghost_id: str) -> None:
+        self.queue.flush()
+        self.queue.discard(ghost_id)
         self._characters.pop(ghost_id, None)
         self._balloons.pop(ghost_id, None)
+
+    def shutdown(self) -> None:
+        self.queue.stop()
+        self.images.close()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from baseware.app import UkaiHostApp
+from baseware.models import Action
+from baseware.trace import read_trace, read_trace_header
+
+ActionRow = Tuple[str, str, Optional[str], Optional[str]]
+
+PRESENCE_SIGNAL = "world.presence.changed"
+
+
+@dataclass
+class ReplayReport:
+    signals: int = 0
+    launches: int = 0
+    closes: int = 0
+    elapsed: float = 0.0
+    actions: List[ActionRow] = field(default_factory=list)
+
+    @property
+    def signals_per_second(self) -> float:
+        return self.signals / self.elapsed if self.elapsed else 0.0
+
+
+class TraceReplayer:
+    def __init__(self, baseware_root: Path, speed: Optional[float] = None) -> None:
+        if speed is not None and speed <= 0:
+            raise ValueError(f"Replay speed must be positive, got {speed}")
+        self.baseware_root = baseware_root
+        self.speed = speed
+
+    def replay(self, trace_path: Path) -> ReplayReport:
+        sandbox = Path(tempfile.mkdtemp(prefix="ukaihost-replay-"))
+        try:
+            root = sandbox / "baseware_root"
+            shutil.copytree(self.baseware_root, root, ignore=shutil.ignore_patterns("runtime"))
+            return self._replay(root, trace_path)
+        finally:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+    def _replay(self, root: Path, trace_path: Path) -> ReplayReport:
+        app = UkaiHostApp(root, bus_mode="sync", hot_reload=False)
+        manager = app.ghost_manager
+        report = ReplayReport()
+
+        def _record(ghost_id: str, actions: List[Action]) -> None:
+            report.actions.extend((ghost_id, action.type, action.text, action.id) for action in actions)
+
+        manager.add_action_listener(_record)
+        manager.scan_installed()
+        # Start every ghost from the save data it had when recording began, not from the live copy.
+        manager.restore_saves(read_trace_header(trace_path).saves)
+        start = time.perf_counter()
+        try:
+            for record in read_trace(trace_path):
+                if self.speed is not None:
+                    delay = record.offset / self.speed - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                signal = record.signal
+                if signal.type == PRESENCE_SIGNAL:
+                    self._sync_presence(manager, signal.payload.get("running", []), report)
+                else:
+                    app.signal_bus.publish(signal)
+                report.signals += 1
+            app.signal_bus.drain()
+            report.elapsed = time.perf_counter() - start
+        finally:
+            manager.remove_action_listener(_record)
+            manager.shutdown()
+            app.signal_bus.close()
+            app.renderer.shutdown()
+        return report
+
+    @staticmethod
+    def _sync_presence(manager: Any, running: List[dict], report: ReplayReport) -> None:
+        wanted = [entry["id"] for entry in running]
+        for manifest in manager.listRunningGhosts():
+            if manifest.id not in wanted:
+                manager.closeGhost(manifest.id)
+                report.closes += 1
+        current = {manifest.id for manifest in manager.listRunningGhosts()}
+        for ghost_id in wanted:
+            if ghost_id not in current and manager.launchGhost(ghost_id) is not None:
+                report.launches += 1
+
+
+def write_golden(path: Path, actions: List[ActionRow]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = ",\n".join(json.dumps(list(row), ensure_ascii=False) for row in actions)
+    path.write_text(f"[\n{rows}\n]\n", encoding="utf-8")
+
+
+def compare_golden(actions: List[ActionRow], golden_path: Path, limit: int = 10) -> List[str]:
+    expected = [tuple(row) for row in json.loads(golden_path.read_text(encoding="utf-8"))]
+    differences = []
+    for index, (want, got) in enumerate(zip(expected, actions)):
+        if want != got:
+            differences.append(f"#{index}: expected {want!r}, got {got!r}")
+            if len(differences) >= limit:
+                break
+    if len(expected) != len(actions):
+        differences.append(f"expected {len(expected)} action(s), got {len(actions)}")
+    return differences
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded signal trace into a sandboxed UkaiHostApp.")
+    parser.add_argument("trace", type=Path)
+    parser.add_argument("--root", type=Path, default=Path(__file__).resolve().parent.parent / "baseware_root")
+    parser.add_argument("--speed", type=float, help="time scale; omit to replay as fast as possible")
+    parser.add_argument("--golden", type=Path, help="compare emitted actions against this golden file")
+    parser.add_argument("--write-golden", type=Path, help="write emitted actions to this golden file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    report = TraceReplayer(args.root, speed=args.speed).replay(args.trace)
+    print(
+        f"{report.signals} signal(s), {len(report.actions)} action(s), "
+        f"{report.launches} launch(es), {report.closes} close(s) "
+        f"in {report.elapsed * 1000:.1f} ms ({report.signals_per_second:.0f} signals/s)"
+    )
+    if args.write_golden:
+        write_golden(args.write_golden, report.actions)
+    if args.golden:
+        differences = compare_golden(report.actions, args.golden)
+        for line in differences:
+            print(line)
+        if differences:
+            sys.exit(1)
+        print("actions match golden output")
+
+
+if __name__ == "__main__":
+    main()
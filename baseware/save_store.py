@@ -1,19 +1,55 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
+
+
+@dataclass
+class SaveStoreStats:
+    requested: int = 0
+    flushed: int = 0
+    coalesced: int = 0
 
 
 class SaveStore:
-    def __init__(self, save_path: Path) -> None:
+    def __init__(
+        self,
+        save_path: Path,
+        write_behind: bool = False,
+        flush_interval: float = 0.5,
+        max_pending: int = 32,
+    ) -> None:
         self.save_path = save_path
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.stats = SaveStoreStats()
         self._created_at: str | None = None
+        self._initialized = False
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Optional[dict] = None
+        self._pending_count = 0
+        self._dirty_since = 0.0
+        self._closed = False
+        self._writer: Optional[threading.Thread] = None
 
     def ensure_initialized(self) -> None:
+        if self._initialized:
+            return
         if self.save_path.exists():
             payload = json.loads(self.save_path.read_text(encoding="utf-8"))
             self._created_at = payload.get("created_at")
+            self._initialized = True
             return
         self.save_path.parent.mkdir(parents=True, exist_ok=True)
         payload = {
@@ -21,19 +57,112 @@ class SaveStore:
             "vars": {},
         }
         self._created_at = payload["created_at"]
-        self.save_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._write(payload)
+        self._initialized = True
 
     def load(self) -> dict:
+        self.flush()
         self.ensure_initialized()
         payload = json.loads(self.save_path.read_text(encoding="utf-8"))
         self._created_at = payload.get("created_at")
         return payload
 
     def save(self, vars_payload: dict) -> None:
+        with self._lock:
+            self.stats.requested += 1
+            if self.write_behind and not self._closed:
+                if self._pending is not None:
+                    self.stats.coalesced += 1
+                else:
+                    self._dirty_since = time.monotonic()
+                self._pending = dict(vars_payload)
+                self._pending_count += 1
+                self._ensure_writer()
+                if self._pending_count >= self.max_pending:
+                    self._wakeup.notify()
+                return
+        with self._io_lock:
+            with self._lock:
+                # This payload is newer than anything still pending, so the final flush must not write the old one.
+                if self._take_pending() is not None:
+                    self.stats.coalesced += 1
+            self._flush_payload(vars_payload)
+
+    def flush(self) -> None:
+        with self._io_lock:
+            with self._lock:
+                pending = self._take_pending()
+            if pending is not None:
+                self._flush_payload(pending)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None and not self._closed:
+            self._writer = threading.Thread(
+                target=self._run_writer,
+                name=f"save-store:{self.save_path.name}",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._pending is None:
+                        self._wakeup.wait()
+                        continue
+                    if self._pending_count >= self.max_pending:
+                        break
+                    remaining = self._dirty_since + self.flush_interval - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(timeout=remaining)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except OSError:
+                logging.exception("Failed to write save data to %s", self.save_path)
+
+    def _take_pending(self) -> Optional[dict]:
+        pending = self._pending
+        self._pending = None
+        self._pending_count = 0
+        return pending
+
+    def _flush_payload(self, vars_payload: dict) -> None:
         self.ensure_initialized()
         created_at = self._created_at or datetime.now().astimezone().isoformat()
         payload = {
             "created_at": created_at,
             "vars": vars_payload,
         }
-        self.save_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        self._write(payload)
+        self.stats.flushed += 1
+
+    def _write(self, payload: dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False, indent=2)
+        fd, temp_name = tempfile.mkstemp(
+            dir=self.save_path.parent,
+            prefix=f".{self.save_path.name}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(data)
+            os.replace(temp_name, self.save_path)
+        except BaseException:
+            try:
+                os.unlink(temp_name)
+            except OSError:
+                pass
+            raise
@@ -1,19 +1,262 @@
 from __future__ import annotations
 
+import logging
+import math
 import threading
-from typing import Optional
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
 
-from baseware.models import ClockPayload, WorldSignal
+from baseware.models import ClockPayload, NetworkStatus, PowerStatus, WorldSignal, freeze_payload
 from baseware.system_info import SystemInfoProvider
 from baseware.world_signal_bus import WorldSignalBus
 
+TimerCallback = Callable[[datetime], None]
+TIMER_SCHEDULES = ("after", "every", "at", "cron")
+
+_CRON_FIELDS: Tuple[Tuple[str, int, int], ...] = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+@dataclass(frozen=True)
+class CronSpec:
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]
+    any_day: bool = True
+    any_weekday: bool = True
+
+    @classmethod
+    def parse(cls, text: str) -> "CronSpec":
+        parts = text.split()
+        if len(parts) != len(_CRON_FIELDS):
+            raise ValueError(f"Cron expression needs 5 fields, got {text!r}")
+        values = [
+            _parse_cron_field(part, name, low, high)
+            for part, (name, low, high) in zip(parts, _CRON_FIELDS)
+        ]
+        weekdays = frozenset(0 if day == 7 else day for day in values[4])
+        return cls(
+            minutes=values[0],
+            hours=values[1],
+            days=values[2],
+            months=values[3],
+            weekdays=weekdays,
+            any_day=parts[2] == "*",
+            any_weekday=parts[4] == "*",
+        )
+
+    @classmethod
+    def daily(cls, at: str) -> "CronSpec":
+        try:
+            hour, minute = (int(part) for part in at.split(":"))
+        except ValueError:
+            raise ValueError(f"Expected HH:MM, got {at!r}") from None
+        return cls.parse(f"{minute} {hour} * * *")
+
+    def matches_day(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self.matches_day(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError("Cron expression never fires")
+
+
+def _parse_cron_field(text: str, name: str, low: int, high: int) -> FrozenSet[int]:
+    values: set[int] = set()
+    for item in text.split(","):
+        step = 1
+        if "/" in item:
+            item, raw_step = item.split("/", 1)
+            step = int(raw_step)
+            if step <= 0:
+                raise ValueError(f"Invalid cron step in {name}: {text!r}")
+        if item == "*":
+            start, end = low, high
+        elif "-" in item:
+            raw_start, raw_end = item.split("-", 1)
+            start, end = int(raw_start), int(raw_end)
+        else:
+            start = int(item)
+            end = high if step != 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron {name} out of range: {text!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass
+class Timer:
+    timer_id: str
+    callback: TimerCallback
+    tick: int
+    interval: Optional[int] = None
+    cron: Optional[CronSpec] = None
+    owner: Optional[str] = None
+    cancelled: bool = False
+    sequence: int = 0
+
+
+class TimerWheel:
+    LEVELS: Tuple[Tuple[int, int], ...] = ((1, 60), (60, 60), (3600, 24))
+    HORIZON = 3600 * 24
+
+    def __init__(self, current_tick: int) -> None:
+        self.current = current_tick
+        self._slots: List[List[List[Timer]]] = [[[] for _ in range(size)] for _, size in self.LEVELS]
+        self._overflow: List[Timer] = []
+        self._due: List[Timer] = []
+
+    def add(self, timer: Timer) -> None:
+        delta = timer.tick - self.current
+        if delta <= 0:
+            self._due.append(timer)
+            return
+        for level, (resolution, size) in enumerate(self.LEVELS):
+            if delta < resolution * size:
+                self._slots[level][(timer.tick // resolution) % size].append(timer)
+                return
+        self._overflow.append(timer)
+
+    def advance(self, now_tick: int) -> List[Timer]:
+        expired = self._take_due()
+        if now_tick - self.current > self.HORIZON:
+            timers = self._drain_all()
+            self.current = now_tick
+            for timer in timers:
+                self.add(timer)
+            expired.extend(self._take_due())
+        while self.current < now_tick:
+            self.current += 1
+            tick = self.current
+            if tick % 60 == 0:
+                if tick % 3600 == 0:
+                    if tick % self.HORIZON == 0:
+                        self._cascade(self._overflow)
+                    self._cascade(self._slots[2][(tick // 3600) % 24])
+                self._cascade(self._slots[1][(tick // 60) % 60])
+            slot = self._slots[0][tick % 60]
+            expired.extend(slot)
+            slot.clear()
+            expired.extend(self._take_due())
+        expired.sort(key=lambda timer: (timer.tick, timer.sequence))
+        return [timer for timer in expired if not timer.cancelled]
+
+    def next_tick(self) -> Optional[int]:
+        if self._due:
+            return self.current
+        candidates: List[int] = []
+        for offset in range(1, 61):
+            tick = self.current + offset
+            if self._slots[0][tick % 60]:
+                candidates.append(tick)
+                break
+        for level, (resolution, size) in enumerate(self.LEVELS[1:], start=1):
+            for offset in range(1, size + 1):
+                boundary = (self.current // resolution + offset) * resolution
+                if self._slots[level][(boundary // resolution) % size]:
+                    candidates.append(boundary)
+                    break
+        if self._overflow:
+            candidates.append((self.current // self.HORIZON + 1) * self.HORIZON)
+        return min(candidates) if candidates else None
+
+    def _cascade(self, bucket: List[Timer]) -> None:
+        timers = list(bucket)
+        bucket.clear()
+        for timer in timers:
+            if not timer.cancelled:
+                self.add(timer)
+
+    def _take_due(self) -> List[Timer]:
+        due = self._due
+        self._due = []
+        return due
+
+    def _drain_all(self) -> List[Timer]:
+        timers = self._take_due() + self._overflow
+        self._overflow = []
+        for level in self._slots:
+            for bucket in level:
+                timers.extend(bucket)
+                bucket.clear()
+        return [timer for timer in timers if not timer.cancelled]
+
+
+@dataclass
+class _ClockState:
+    hour: Optional[int] = None
+    day: Optional[Tuple[int, int, int]] = None
+
+
+@dataclass
+class PollStats:
+    polls: int = 0
+    published: int = 0
+    total_us: float = 0.0
+    max_us: float = 0.0
+
+    @property
+    def mean_us(self) -> float:
+        return self.total_us / self.polls if self.polls else 0.0
+
 
 class Scheduler:
-    def __init__(self, bus: WorldSignalBus, system_info: SystemInfoProvider) -> None:
+    CLOCK_TIMER = "scheduler:clock"
+    SYSTEM_TIMER = "scheduler:system"
+
+    def __init__(
+        self,
+        bus: WorldSignalBus,
+        system_info: SystemInfoProvider,
+        poll_interval: float = 5.0,
+    ) -> None:
         self.bus = bus
         self.system_info = system_info
+        self.poll_interval = poll_interval
+        self.poll_stats = PollStats()
+        self._power: Optional[PowerStatus] = None
+        self._network: Optional[NetworkStatus] = None
         self._thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._wheel = TimerWheel(self._current_tick())
+        self._timers: Dict[str, Timer] = {}
+        self._sequence = 0
+        self._clock = _ClockState()
+        self.wakeups = 0
 
     def start(self) -> None:
         if self._thread and self._thread.is_alive():
@@ -24,28 +267,172 @@ class Scheduler:
 
     def stop(self) -> None:
         self._stop_event.set()
+        self._wakeup.set()
         if self._thread:
             self._thread.join(timeout=1)
+        stats = self.poll_stats
+        if stats.polls:
+            logging.info(
+                "System poll: %d poll(s), %d signal(s) published, %.1f us mean, %.1f us max",
+                stats.polls,
+                stats.published,
+                stats.mean_us,
+                stats.max_us,
+            )
+
+    def add_timer(
+        self,
+        timer_id: str,
+        callback: TimerCallback,
+        *,
+        after: Optional[float] = None,
+        every: Optional[float] = None,
+        at: Optional[str] = None,
+        cron: Optional[str] = None,
+        owner: Optional[str] = None,
+    ) -> Timer:
+        if sum(option is not None for option in (after, every, at, cron)) != 1:
+            raise ValueError("Timers need exactly one of after, every, at or cron")
+        now = self.system_info.now()
+        now_tick = math.floor(now.timestamp())
+        interval: Optional[int] = None
+        spec: Optional[CronSpec] = None
+        if after is not None:
+            tick = now_tick + max(1, math.ceil(after))
+        elif every is not None:
+            interval = max(1, math.ceil(every))
+            tick = now_tick + interval
+        else:
+            spec = CronSpec.daily(at) if at is not None else CronSpec.parse(cron or "")
+            tick = math.floor(spec.next_after(now).timestamp())
+        with self._lock:
+            previous = self._timers.get(timer_id)
+            if previous is not None:
+                previous.cancelled = True
+            self._sequence += 1
+            timer = Timer(
+                timer_id=timer_id,
+                callback=callback,
+                tick=tick,
+                interval=interval,
+                cron=spec,
+                owner=owner,
+                sequence=self._sequence,
+            )
+            self._timers[timer_id] = timer
+            self._wheel.add(timer)
+        self._wakeup.set()
+        return timer
+
+    def cancel_timer(self, timer_id: str) -> bool:
+        with self._lock:
+            timer = self._timers.pop(timer_id, None)
+            if timer is None:
+                return False
+            timer.cancelled = True
+            return True
+
+    def cancel_owner(self, owner: str) -> int:
+        with self._lock:
+            owned = [timer_id for timer_id, timer in self._timers.items() if timer.owner == owner]
+            for timer_id in owned:
+                self._timers.pop(timer_id).cancelled = True
+            return len(owned)
+
+    def run_pending(self, now: Optional[datetime] = None) -> int:
+        now = now or self.system_info.now()
+        with self._lock:
+            expired = self._wheel.advance(math.floor(now.timestamp()))
+            for timer in expired:
+                self._reschedule(timer, now)
+        for timer in expired:
+            try:
+                timer.callback(now)
+            except Exception:
+                logging.exception("Timer %s failed", timer.timer_id)
+        return len(expired)
+
+    def _reschedule(self, timer: Timer, now: datetime) -> None:
+        now_tick = math.floor(now.timestamp())
+        if timer.interval is not None:
+            timer.tick = max(timer.tick + timer.interval, now_tick + 1)
+        elif timer.cron is not None:
+            timer.tick = math.floor(timer.cron.next_after(now).timestamp())
+        else:
+            if self._timers.get(timer.timer_id) is timer:
+                del self._timers[timer.timer_id]
+            return
+        self._wheel.add(timer)
 
     def _run(self) -> None:
+        self._publish_clock(self.system_info.now())
+        self.add_timer(self.CLOCK_TIMER, self._publish_clock, cron="* * * * *")
+        self.add_timer(self.SYSTEM_TIMER, self._publish_system, every=self.poll_interval)
         while not self._stop_event.is_set():
-            now = self.system_info.now()
-            payload = ClockPayload(
+            self.run_pending()
+            self.wakeups += 1
+            with self._lock:
+                next_tick = self._wheel.next_tick()
+            timeout = None
+            if next_tick is not None:
+                timeout = max(0.0, next_tick - self.system_info.now().timestamp()) + 0.001
+            self._wakeup.wait(timeout=timeout)
+            self._wakeup.clear()
+
+    def _publish_clock(self, now: datetime) -> None:
+        payload = freeze_payload(
+            ClockPayload(
                 time=now,
-                timezone=self.system_info.timezone(),
+                timezone=now.tzname() or "UTC",
                 minute=now.minute,
                 hour=now.hour,
                 weekday=now.weekday(),
             ).to_payload()
-            self.bus.publish(WorldSignal(type="world.clock", payload=payload))
-            self.bus.publish(WorldSignal(type="world.clock.minute_change", payload=payload))
-            uptime_payload = {
-                "type": "world.uptime",
-                "seconds": self.system_info.uptime_seconds(),
+        )
+        self.bus.publish(WorldSignal(type="world.clock", payload=payload))
+        self.bus.publish(WorldSignal(type="world.clock.minute_change", payload=payload))
+        day = (now.year, now.month, now.day)
+        if self._clock.hour is not None and (now.hour != self._clock.hour or day != self._clock.day):
+            self.bus.publish(WorldSignal(type="world.clock.hour_change", payload=payload))
+        if self._clock.day is not None and day != self._clock.day:
+            self.bus.publish(WorldSignal(type="world.clock.day_change", payload=payload))
+        self._clock.hour = now.hour
+        self._clock.day = day
+        uptime_payload = {
+            "type": "world.uptime",
+            "seconds": self.system_info.uptime_seconds(),
+        }
+        self.bus.publish(WorldSignal(type="world.uptime", payload=uptime_payload))
+
+    def system_signals(self, force: bool = False) -> List[WorldSignal]:
+        start = time.perf_counter()
+        power = self.system_info.power_status()
+        network = self.system_info.network_status()
+        signals = []
+        if force or power != self._power:
+            self._power = power
+            payload = {"type": "world.power", "level": power.level, "charging": power.charging}
+            signals.append(WorldSignal(type="world.power", payload=payload))
+        if force or network != self._network:
+            self._network = network
+            payload = {
+                "type": "world.network",
+                "online": network.online,
+                "connection_type": network.connection_type,
             }
-            self.bus.publish(WorldSignal(type="world.uptime", payload=uptime_payload))
-            self._stop_event.wait(timeout=self._seconds_until_next_minute(now))
+            signals.append(WorldSignal(type="world.network", payload=payload))
+        elapsed = (time.perf_counter() - start) * 1_000_000
+        stats = self.poll_stats
+        stats.polls += 1
+        stats.published += len(signals)
+        stats.total_us += elapsed
+        stats.max_us = max(stats.max_us, elapsed)
+        return signals
+
+    def _publish_system(self, now: datetime) -> None:
+        signals = self.system_signals()
+        if signals:
+            self.bus.publish_many(signals)
 
-    @staticmethod
-    def _seconds_until_next_minute(now) -> float:
-        return 60 - (now.second + now.microsecond / 1_000_000)
+    def _current_tick(self) -> int:
+        return math.floor(self.system_info.now().timestamp())
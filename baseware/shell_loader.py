@@ -1,44 +1,146 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator, Optional, Tuple
 
-from baseware.models import Hitbox, ShellDefinition, Surface
+from baseware.hit_test import Hitbox, HitboxGrid
+from baseware.models import ShellDefinition, Surface
+from baseware.shell_pack import ShellPack, shell_pack_path
+from baseware.symbols import intern
+
+FileSignature = Optional[Tuple[int, int]]
+
+
+class LazySurfaceMap(Mapping):
+    def __init__(self, raw_surfaces: Dict[str, Optional[dict]]) -> None:
+        self._raw = raw_surfaces
+        self._materialized: Dict[str, Surface] = {}
+
+    def __getitem__(self, surface_id: str) -> Surface:
+        surface = self._materialized.get(surface_id)
+        if surface is None:
+            details = self._raw[surface_id]
+            if details is None:
+                return self._materialized[surface_id]
+            surface = self._materialized.setdefault(surface_id, _build_surface(intern(surface_id), details))
+            # The parsed JSON is no longer needed once the compact surface exists.
+            self._raw[surface_id] = None
+        return surface
+
+    def __contains__(self, surface_id: object) -> bool:
+        return surface_id in self._raw
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    @property
+    def materialized_count(self) -> int:
+        return len(self._materialized)
+
+
+def _build_surface(surface_id: str, details: dict) -> Surface:
+    hitboxes = tuple(
+        Hitbox(
+            id=intern(hitbox["id"]),
+            x=int(hitbox["x"]),
+            y=int(hitbox["y"]),
+            w=int(hitbox["w"]),
+            h=int(hitbox["h"]),
+        )
+        for hitbox in details.get("hitbox", [])
+    )
+    return Surface(
+        id=surface_id,
+        file=details.get("file"),
+        hit_index=HitboxGrid(hitboxes),
+    )
 
 
 class ShellLoader:
+    _cache: Dict[Tuple[str, str], Tuple[Tuple[FileSignature, ...], ShellDefinition]] = {}
+    _cache_lock = threading.Lock()
+
     def load(self, shell_dir: Path, surfaces_file: str) -> ShellDefinition:
-        data = json.loads((shell_dir / surfaces_file).read_text(encoding="utf-8"))
-        surfaces: Dict[str, Surface] = {}
-        for surface_id, details in data.get("surfaces", {}).items():
-            hitboxes = [
-                Hitbox(
-                    id=hitbox["id"],
-                    x=int(hitbox["x"]),
-                    y=int(hitbox["y"]),
-                    w=int(hitbox["w"]),
-                    h=int(hitbox["h"]),
-                )
-                for hitbox in details.get("hitbox", [])
-            ]
-            surfaces[surface_id] = Surface(
-                id=surface_id,
-                file=details.get("file"),
-                hitboxes=hitboxes,
-            )
-        bubble_offset = self._load_bubble_offset(shell_dir)
+        key = (str(shell_dir.absolute()), surfaces_file)
+        signature = (
+            self._signature(shell_dir / surfaces_file),
+            self._signature(shell_dir / "meta.json"),
+            self._signature(shell_pack_path(shell_dir)),
+        )
+        with self._cache_lock:
+            cached = self._cache.get(key)
+        if cached is not None and cached[0] == signature:
+            pack = cached[1].pack
+            if pack is None or pack.is_fresh(shell_dir):
+                return cached[1]
+        shell = self._load_uncached(shell_dir, surfaces_file)
+        with self._cache_lock:
+            self._cache[key] = (signature, shell)
+        return shell
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    def _load_uncached(self, shell_dir: Path, surfaces_file: str) -> ShellDefinition:
+        pack = self._open_pack(shell_dir, surfaces_file)
+        data = self._read_json(shell_dir, surfaces_file, pack)
+        if data is None:
+            raise FileNotFoundError(shell_dir / surfaces_file)
+        bubble_offset = self._load_bubble_offset(self._read_json(shell_dir, "meta.json", pack))
+        raw_surfaces = {intern(surface_id): details for surface_id, details in data.get("surfaces", {}).items()}
         return ShellDefinition(
-            default_surface=data.get("default", "idle"),
-            surfaces=surfaces,
+            default_surface=intern(data.get("default", "idle")),
+            surfaces=LazySurfaceMap(raw_surfaces),
             bubble_offset=bubble_offset,
+            root=shell_dir,
+            pack=pack,
         )
 
-    def _load_bubble_offset(self, shell_dir: Path) -> tuple[int, int] | None:
-        meta_path = shell_dir / "meta.json"
-        if not meta_path.exists():
+    @staticmethod
+    def _open_pack(shell_dir: Path, surfaces_file: str) -> Optional[ShellPack]:
+        pack_path = shell_pack_path(shell_dir)
+        if not pack_path.exists():
+            return None
+        try:
+            pack = ShellPack(pack_path)
+        except (OSError, ValueError) as exc:
+            logging.warning("Ignoring shell pack %s: %s", pack_path, exc)
+            return None
+        if surfaces_file not in pack or not pack.is_fresh(shell_dir):
+            pack.close()
+            return None
+        return pack
+
+    @staticmethod
+    def _read_json(shell_dir: Path, name: str, pack: Optional[ShellPack]) -> Optional[dict]:
+        if pack is not None:
+            data = pack.get(name)
+            return json.loads(bytes(data).decode("utf-8")) if data is not None else None
+        path = shell_dir / name
+        if not path.exists():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _signature(path: Path) -> FileSignature:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_bubble_offset(self, meta: Optional[dict]) -> tuple[int, int] | None:
+        if meta is None:
             return None
-        meta = json.loads(meta_path.read_text(encoding="utf-8"))
         descript = meta.get("descript", {})
         raw_offset = descript.get("balloon.offset")
         if not isinstance(raw_offset, str):
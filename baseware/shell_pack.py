@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from stat import S_ISREG
+from typing import Dict, Iterator, List, Optional, Tuple
+
+PACK_MAGIC = b"UKSP"
+PACK_VERSION = 2
+PACK_SUFFIX = ".pack"
+_HEADER = struct.Struct("<4sHII")
+_ENTRY = struct.Struct("<QQqH")
+
+SourceStats = Dict[str, Tuple[int, int]]
+
+
+def shell_pack_path(shell_dir: Path) -> Path:
+    return shell_dir.with_name(shell_dir.name + PACK_SUFFIX)
+
+
+def scan_shell_sources(shell_dir: Path) -> SourceStats:
+    sources: SourceStats = {}
+    for path in shell_dir.rglob("*"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if S_ISREG(stat.st_mode):
+            sources[path.relative_to(shell_dir).as_posix()] = (stat.st_size, stat.st_mtime_ns)
+    return sources
+
+
+def build_shell_pack(shell_dir: Path, pack_path: Optional[Path] = None) -> Path:
+    pack_path = pack_path or shell_pack_path(shell_dir)
+    sources = sorted(scan_shell_sources(shell_dir).items())
+    names = [name.encode("utf-8") for name, _ in sources]
+    index_size = sum(_ENTRY.size + len(name) for name in names)
+    offset = _HEADER.size + index_size
+    entries: List[Tuple[bytes, int, int, int]] = []
+    for name, (_, (size, mtime_ns)) in zip(names, sources):
+        entries.append((name, offset, size, mtime_ns))
+        offset += size
+    temp_path = pack_path.with_name(f".{pack_path.name}.tmp")
+    try:
+        with temp_path.open("wb") as handle:
+            handle.write(_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(entries), index_size))
+            for name, entry_offset, size, mtime_ns in entries:
+                handle.write(_ENTRY.pack(entry_offset, size, mtime_ns, len(name)))
+                handle.write(name)
+            for name, _, size, _ in entries:
+                data = (shell_dir / name.decode("utf-8")).read_bytes()
+                if len(data) != size:
+                    raise ValueError(f"{shell_dir / name.decode('utf-8')} changed while packing")
+                handle.write(data)
+        os.replace(temp_path, pack_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return pack_path
+
+
+class ShellPack:
+    def __init__(self, pack_path: Path) -> None:
+        self.path = pack_path
+        with pack_path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._sources: SourceStats = {}
+        try:
+            self._read_index()
+        except BaseException:
+            self.close()
+            raise
+
+    def _read_index(self) -> None:
+        length = len(self._mmap)
+        if length < _HEADER.size:
+            raise ValueError(f"Truncated shell pack: {self.path}")
+        magic, version, count, index_size = _HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC:
+            raise ValueError(f"Not a shell pack: {self.path}")
+        if version != PACK_VERSION:
+            raise ValueError(f"Unsupported shell pack version {version}: {self.path}")
+        position = _HEADER.size
+        for _ in range(count):
+            if position + _ENTRY.size > length:
+                raise ValueError(f"Truncated shell pack: {self.path}")
+            offset, size, mtime_ns, name_length = _ENTRY.unpack_from(self._mmap, position)
+            position += _ENTRY.size
+            if position + name_length > length or offset + size > length:
+                raise ValueError(f"Truncated shell pack: {self.path}")
+            name = bytes(self._view[position : position + name_length]).decode("utf-8")
+            position += name_length
+            self._index[name] = (offset, size)
+            self._sources[name] = (size, mtime_ns)
+        if position != _HEADER.size + index_size:
+            raise ValueError(f"Corrupt shell pack index: {self.path}")
+
+    def close(self) -> None:
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def get(self, name: str) -> Optional[memoryview]:
+        entry = self._index.get(name)
+        if entry is None:
+            return None
+        offset, size = entry
+        return self._view[offset : offset + size]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def names(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def is_fresh(self, shell_dir: Path) -> bool:
+        return scan_shell_sources(shell_dir) == self._sources
+
+
+def _shell_dirs(baseware_root: Path) -> Iterator[Path]:
+    for manifest_path in sorted((baseware_root / "ghosts").glob("*/manifest.json")):
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+        shell_dir = manifest_path.parent / data["shell"]["default"]
+        if shell_dir.is_dir():
+            yield shell_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Pack shell directories into memory-mappable .pack files.")
+    parser.add_argument("shell_dirs", nargs="*", type=Path)
+    parser.add_argument("--root", type=Path, help="pack the default shell of every ghost under this baseware_root")
+    args = parser.parse_args()
+    shell_dirs = list(args.shell_dirs)
+    if args.root:
+        shell_dirs.extend(_shell_dirs(args.root))
+    for shell_dir in shell_dirs:
+        pack_path = build_shell_pack(shell_dir)
+        print(f"{shell_dir} -> {pack_path} ({pack_path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
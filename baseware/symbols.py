@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import sys
+from typing import Dict
+
+
+class SymbolTable:
+    def __init__(self) -> None:
+        self._symbols: Dict[str, str] = {}
+
+    def intern(self, text: str) -> str:
+        symbol = self._symbols.get(text)
+        if symbol is None:
+            symbol = self._symbols.setdefault(text, sys.intern(text))
+        return symbol
+
+    def __contains__(self, text: object) -> bool:
+        return text in self._symbols
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+symbols = SymbolTable()
+intern = symbols.intern
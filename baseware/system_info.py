@@ -1,14 +1,198 @@
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Optional
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar
 
 from baseware.models import NetworkStatus, PowerStatus
 
+SYS_POWER_SUPPLY = Path("/sys/class/power_supply")
+SYS_NET = Path("/sys/class/net")
+PROC_NET_ROUTE = Path("/proc/net/route")
+PROC_NET_IPV6_ROUTE = Path("/proc/net/ipv6_route")
 
-class SystemInfoProvider:
+T = TypeVar("T")
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        with open(path, encoding="ascii", errors="replace") as handle:
+            return handle.read().strip()
+    except OSError:
+        return None
+
+
+class _OpenFiles:
     def __init__(self) -> None:
+        self._fds: Dict[Path, int] = {}
+
+    def read(self, path: Path) -> Optional[str]:
+        for _ in range(2):
+            fd = self._fds.get(path)
+            try:
+                if fd is None:
+                    fd = self._fds[path] = os.open(path, os.O_RDONLY)
+                return os.pread(fd, 65536, 0).decode("ascii", "replace").strip()
+            except OSError:
+                self.forget(path)
+        return None
+
+    def forget(self, path: Path) -> None:
+        fd = self._fds.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+
+    def close(self) -> None:
+        for path in list(self._fds):
+            self.forget(path)
+
+
+class LinuxPowerProvider:
+    def __init__(self, root: Path = SYS_POWER_SUPPLY, rescan_interval: float = 60.0) -> None:
+        self.root = root
+        self.rescan_interval = rescan_interval
+        self._batteries: List[Path] = []
+        self._scanned_at: Optional[float] = None
+        self._files = _OpenFiles()
+
+    def read(self) -> PowerStatus:
+        self._scan()
+        levels: List[int] = []
+        charging: Optional[bool] = None
+        for battery in self._batteries:
+            capacity = self._files.read(battery / "capacity")
+            if capacity and capacity.isdigit():
+                levels.append(int(capacity))
+            status = self._files.read(battery / "status")
+            if status is not None:
+                charging = bool(charging) or status == "Charging"
+        level = round(sum(levels) / len(levels)) if levels else None
+        return PowerStatus(level=level, charging=charging)
+
+    def _scan(self) -> None:
+        now = time.monotonic()
+        if self._scanned_at is not None and now - self._scanned_at < self.rescan_interval:
+            return
+        self._scanned_at = now
+        batteries = []
+        try:
+            entries = sorted(os.listdir(self.root))
+        except OSError:
+            entries = []
+        for name in entries:
+            supply = self.root / name
+            if _read_text(supply / "type") == "Battery" and _read_text(supply / "present") != "0":
+                batteries.append(supply)
+        self._files.close()
+        self._batteries = batteries
+
+
+class LinuxNetworkProvider:
+    def __init__(
+        self,
+        sys_root: Path = SYS_NET,
+        route_path: Path = PROC_NET_ROUTE,
+        ipv6_route_path: Path = PROC_NET_IPV6_ROUTE,
+    ) -> None:
+        self.sys_root = sys_root
+        self.route_path = route_path
+        self.ipv6_route_path = ipv6_route_path
+        self._files = _OpenFiles()
+        self._types: Dict[str, str] = {}
+
+    def read(self) -> NetworkStatus:
+        interface = self._default_interface()
+        if interface is None:
+            return NetworkStatus(online=False, connection_type=None)
+        return NetworkStatus(online=True, connection_type=self._connection_type(interface))
+
+    def _default_interface(self) -> Optional[str]:
+        for interface in self._default_routes():
+            if self._files.read(self.sys_root / interface / "operstate") in ("up", "unknown"):
+                return interface
+        return None
+
+    def _default_routes(self) -> List[str]:
+        interfaces: List[str] = []
+        route_table = self._files.read(self.route_path) or ""
+        for line in route_table.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) > 7 and fields[1] == "00000000" and fields[7] == "00000000":
+                interfaces.append(fields[0])
+        ipv6_table = self._files.read(self.ipv6_route_path) or ""
+        for line in ipv6_table.splitlines():
+            fields = line.split()
+            if len(fields) == 10 and fields[0] == "0" * 32 and fields[1] == "00" and fields[9] != "lo":
+                interfaces.append(fields[9])
+        return interfaces
+
+    def _connection_type(self, interface: str) -> str:
+        connection_type = self._types.get(interface)
+        if connection_type is None:
+            connection_type = self._types[interface] = self._probe_connection_type(interface)
+        return connection_type
+
+    def _probe_connection_type(self, interface: str) -> str:
+        device = self.sys_root / interface
+        if (device / "wireless").exists() or (device / "phy80211").exists():
+            return "wifi"
+        if interface.startswith("ww"):
+            return "cellular"
+        if _read_text(device / "type") == "1":
+            return "ethernet"
+        return "other"
+
+
+class _NullPowerProvider:
+    def read(self) -> PowerStatus:
+        return PowerStatus(level=None, charging=None)
+
+
+class _NullNetworkProvider:
+    def read(self) -> NetworkStatus:
+        return NetworkStatus(online=None, connection_type=None)
+
+
+class _TtlValue(Generic[T]):
+    def __init__(self, read: Callable[[], T], ttl: float) -> None:
+        self.read = read
+        self.ttl = ttl
+        self.reads = 0
+        self._cached: Optional[Tuple[float, T]] = None
+
+    def get(self) -> T:
+        now = time.monotonic()
+        cached = self._cached
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+        value = self.read()
+        self.reads += 1
+        self._cached = (now, value)
+        return value
+
+    def invalidate(self) -> None:
+        self._cached = None
+
+
+class SystemInfoProvider:
+    def __init__(
+        self,
+        power_provider=None,
+        network_provider=None,
+        power_ttl: float = 10.0,
+        network_ttl: float = 5.0,
+    ) -> None:
         self._boot_time = datetime.now().astimezone()
+        linux = sys.platform.startswith("linux")
+        if power_provider is None:
+            power_provider = LinuxPowerProvider() if linux and SYS_POWER_SUPPLY.exists() else _NullPowerProvider()
+        if network_provider is None:
+            network_provider = LinuxNetworkProvider() if linux and PROC_NET_ROUTE.exists() else _NullNetworkProvider()
+        self._power = _TtlValue(power_provider.read, power_ttl)
+        self._network = _TtlValue(network_provider.read, network_ttl)
 
     def now(self) -> datetime:
         return datetime.now().astimezone()
@@ -18,10 +202,48 @@ class SystemInfoProvider:
         return int(delta.total_seconds())
 
     def power_status(self) -> PowerStatus:
-        return PowerStatus(level=None, charging=None)
+        return self._power.get()
 
     def network_status(self) -> NetworkStatus:
-        return NetworkStatus(online=None, connection_type=None)
+        return self._network.get()
+
+    def invalidate(self) -> None:
+        self._power.invalidate()
+        self._network.invalidate()
 
     def timezone(self) -> str:
-        return self.now().tzinfo.tzname(self.now()) or "UTC"
+        now = self.now()
+        return now.tzname() or "UTC"
+
+
+class FakeSystemInfoProvider(SystemInfoProvider):
+    def __init__(
+        self,
+        now: Optional[datetime] = None,
+        power: Optional[PowerStatus] = None,
+        network: Optional[NetworkStatus] = None,
+    ) -> None:
+        super().__init__(power_provider=_NullPowerProvider(), network_provider=_NullNetworkProvider())
+        self.power = power or PowerStatus(level=100, charging=False)
+        self.network = network or NetworkStatus(online=True, connection_type="ethernet")
+        self._now = now or datetime.now().astimezone()
+        self._boot_time = self._now
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float) -> datetime:
+        self._now += timedelta(seconds=seconds)
+        return self._now
+
+    def power_status(self) -> PowerStatus:
+        return self.power
+
+    def network_status(self) -> NetworkStatus:
+        return self.network
+
+    def set_power(self, level: Optional[int], charging: Optional[bool]) -> None:
+        self.power = PowerStatus(level=level, charging=charging)
+
+    def set_network(self, online: Optional[bool], connection_type: Optional[str]) -> None:
+        self.network = NetworkStatus(online=online, connection_type=connection_type)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import logging
+import marshal
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from baseware.models import WorldSignal
+from baseware.world_signal_bus import WorldSignalBus
+
+TRACE_MAGIC = b"UKTR"
+TRACE_VERSION = 2
+TRACE_SUFFIX = ".trace"
+_LENGTH = struct.Struct("<I")
+
+
+SaveSnapshot = Dict[str, Optional[Dict[str, Any]]]
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    offset: float
+    signal: WorldSignal
+
+
+@dataclass(frozen=True)
+class TraceHeader:
+    version: int
+    saves: SaveSnapshot
+
+
+def traces_dir(baseware_root: Path) -> Path:
+    return baseware_root / "runtime" / "traces"
+
+
+def new_trace_path(baseware_root: Path) -> Path:
+    return traces_dir(baseware_root) / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}{TRACE_SUFFIX}"
+
+
+class TraceRecorder:
+    def __init__(self, path: Path, flush_every: int = 256, saves: Optional[SaveSnapshot] = None) -> None:
+        self.path = path
+        self.flush_every = flush_every
+        self.records = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._bus: Optional[WorldSignalBus] = None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle: Optional[BinaryIO] = path.open("wb")
+        header = marshal.dumps({"saves": dict(saves or {})})
+        self._handle.write(TRACE_MAGIC + bytes([TRACE_VERSION]) + _LENGTH.pack(len(header)) + header)
+        self._start = time.monotonic()
+
+    def attach(self, bus: WorldSignalBus, snapshot: Optional[Callable[[], Iterable[WorldSignal]]] = None) -> None:
+        # Holding the lock while tapping keeps the snapshot ahead of any signal published in the meantime.
+        with self._lock:
+            self._bus = bus
+            bus.add_tap(self.record_many)
+            if snapshot is not None:
+                self._write(self._encode(list(snapshot()), time.monotonic() - self._start))
+
+    def record(self, signal: WorldSignal) -> None:
+        self.record_many([signal])
+
+    def record_many(self, signals: List[WorldSignal]) -> None:
+        chunks = self._encode(signals, time.monotonic() - self._start)
+        with self._lock:
+            self._write(chunks)
+
+    def _encode(self, signals: List[WorldSignal], offset: float) -> List[bytes]:
+        chunks = []
+        for signal in signals:
+            try:
+                body = marshal.dumps((offset, signal.type, dict(signal.payload)))
+            except ValueError:
+                logging.warning("Trace skipped %s: payload is not serializable", signal.type)
+                self.skipped += 1
+                continue
+            chunks.append(_LENGTH.pack(len(body)) + body)
+        return chunks
+
+    def _write(self, chunks: List[bytes]) -> None:
+        if self._handle is None:
+            return
+        self._handle.write(b"".join(chunks))
+        previous = self.records
+        self.records += len(chunks)
+        if previous // self.flush_every != self.records // self.flush_every:
+            self._handle.flush()
+
+    def close(self) -> None:
+        if self._bus is not None:
+            self._bus.remove_tap(self.record_many)
+            self._bus = None
+        with self._lock:
+            if self._handle is None:
+                return
+            self._handle.close()
+            self._handle = None
+        logging.info("Trace %s: %d signal(s) recorded, %d skipped", self.path, self.records, self.skipped)
+
+
+def _read_header(handle: BinaryIO, path: Path) -> TraceHeader:
+    header = handle.read(len(TRACE_MAGIC) + 1)
+    if len(header) <= len(TRACE_MAGIC) or header[: len(TRACE_MAGIC)] != TRACE_MAGIC:
+        raise ValueError(f"Not a signal trace: {path}")
+    version = header[len(TRACE_MAGIC)]
+    if version not in (1, TRACE_VERSION):
+        raise ValueError(f"Unsupported trace version {version}: {path}")
+    if version == 1:
+        return TraceHeader(version=version, saves={})
+    prefix = handle.read(_LENGTH.size)
+    if len(prefix) < _LENGTH.size:
+        raise ValueError(f"Truncated trace header: {path}")
+    (length,) = _LENGTH.unpack(prefix)
+    try:
+        data = marshal.loads(handle.read(length))
+        saves = dict(data["saves"])
+    except (EOFError, ValueError, TypeError, KeyError):
+        raise ValueError(f"Corrupt trace header: {path}") from None
+    return TraceHeader(version=version, saves=saves)
+
+
+def read_trace_header(path: Path) -> TraceHeader:
+    with path.open("rb") as handle:
+        return _read_header(handle, path)
+
+
+def read_trace(path: Path) -> Iterator[TraceRecord]:
+    with path.open("rb") as handle:
+        _read_header(handle, path)
+        while True:
+            prefix = handle.read(_LENGTH.size)
+            if not prefix:
+                return
+            if len(prefix) < _LENGTH.size:
+                logging.warning("Trace %s ends with a truncated record", path)
+                return
+            (length,) = _LENGTH.unpack(prefix)
+            body = handle.read(length)
+            if len(body) < length:
+                logging.warning("Trace %s ends with a truncated record", path)
+                return
+            offset, signal_type, payload = marshal.loads(body)
+            yield TraceRecord(offset=offset, signal=WorldSignal(type=signal_type, payload=payload))
@@ -1,29 +1,409 @@
 from __future__ import annotations
 
+import logging
 import threading
-from typing import Dict, List
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
 
-from baseware.models import Subscriber, WorldSignal
+from baseware.metrics import Metrics
+from baseware.models import BatchSubscriber, Subscriber, WorldSignal
 
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE_LATEST = "coalesce_latest"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE_LATEST)
 
-class WorldSignalBus:
+
+class _TopicNode:
+    def __init__(self) -> None:
+        self.children: Dict[str, _TopicNode] = {}
+        self.subscribers: List[Tuple[int, Subscriber]] = []
+
+    def is_empty(self) -> bool:
+        return not self.children and not self.subscribers
+
+
+class _TopicTrie:
     def __init__(self) -> None:
+        self.root = _TopicNode()
+
+    @staticmethod
+    def split(pattern: str) -> List[str]:
+        if pattern == "*":
+            return ["#"]
+        return pattern.split(".")
+
+    def add(self, pattern: str, order: int, callback: Subscriber) -> None:
+        node = self.root
+        for segment in self.split(pattern):
+            node = node.children.setdefault(segment, _TopicNode())
+        node.subscribers.append((order, callback))
+
+    def remove(self, pattern: str, callback: Subscriber) -> None:
+        path = [self.root]
+        for segment in self.split(pattern):
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+        subscribers = path[-1].subscribers
+        for index, (_, subscribed) in enumerate(subscribers):
+            if subscribed == callback:
+                del subscribers[index]
+                break
+        segments = self.split(pattern)
+        for depth in range(len(segments), 0, -1):
+            if not path[depth].is_empty():
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def match(self, signal_type: str) -> Tuple[Subscriber, ...]:
+        found: Dict[int, Subscriber] = {}
+        self._match(self.root, signal_type.split("."), 0, found)
+        return tuple(found[order] for order in sorted(found))
+
+    def _match(self, node: _TopicNode, segments: List[str], index: int, found: Dict[int, Subscriber]) -> None:
+        wildcard = node.children.get("#")
+        if wildcard is not None:
+            for rest in range(index, len(segments) + 1):
+                self._match(wildcard, segments, rest, found)
+        if index == len(segments):
+            for order, callback in node.subscribers:
+                found[order] = callback
+            return
+        exact = node.children.get(segments[index])
+        if exact is not None:
+            self._match(exact, segments, index + 1, found)
+        single = node.children.get("*")
+        if single is not None:
+            self._match(single, segments, index + 1, found)
+
+
+class _SubscriberQueue:
+    def __init__(self, callback: Subscriber, maxsize: int) -> None:
+        self.callback = callback
+        self.batch_callback: Optional[BatchSubscriber] = None
+        self.maxsize = maxsize
+        self.items: Deque[WorldSignal] = deque()
+        self.refs = 0
+        self.scheduled = False
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+        self.overfilled = 0
+
+
+class WorldSignalBus:
+    def __init__(
+        self,
+        mode: str = "sync",
+        workers: int = 4,
+        queue_size: int = 256,
+        overflow: Optional[Dict[str, str]] = None,
+        default_overflow: str = OVERFLOW_BLOCK,
+        drain_batch: int = 32,
+        route_cache_size: int = 1024,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        if mode not in ("sync", "async"):
+            raise ValueError(f"Unknown bus mode: {mode}")
+        for policy in [default_overflow, *(overflow or {}).values()]:
+            if policy not in OVERFLOW_POLICIES:
+                raise ValueError(f"Unknown overflow policy: {policy}")
+        self.mode = mode
+        self.queue_size = queue_size
+        self.default_overflow = default_overflow
+        self.drain_batch = drain_batch
+        self.route_cache_size = route_cache_size
+        self.metrics = metrics
+        self._overflow: Dict[str, str] = dict(overflow or {})
         self._lock = threading.Lock()
         self._subscribers: Dict[str, List[Subscriber]] = {}
+        self._topics = _TopicTrie()
+        self._routes: Dict[str, Tuple[Subscriber, ...]] = {}
+        self._order = 0
+        self._queues: Dict[Subscriber, _SubscriberQueue] = {}
+        self._queue_state = threading.Condition()
+        self._pending = 0
+        self._local = threading.local()
+        self._taps: Tuple[BatchSubscriber, ...] = ()
+        self._closed = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if mode == "async":
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="signal-bus")
+
+    def set_overflow_policy(self, signal_type: str, policy: str) -> None:
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        with self._lock:
+            self._overflow[signal_type] = policy
 
-    def subscribe(self, signal_type: str, callback: Subscriber) -> None:
+    def subscribe(
+        self,
+        signal_type: str,
+        callback: Subscriber,
+        batch_callback: Optional[BatchSubscriber] = None,
+    ) -> None:
         with self._lock:
             self._subscribers.setdefault(signal_type, []).append(callback)
+            self._order += 1
+            self._topics.add(signal_type, self._order, callback)
+            self._routes.clear()
+            queue = self._queues.get(callback)
+            if queue is None:
+                queue = self._queues[callback] = _SubscriberQueue(callback, self.queue_size)
+            if batch_callback is not None:
+                queue.batch_callback = batch_callback
+            queue.refs += 1
 
     def unsubscribe(self, signal_type: str, callback: Subscriber) -> None:
         with self._lock:
             subscribers = self._subscribers.get(signal_type, [])
-            if callback in subscribers:
-                subscribers.remove(callback)
+            if callback not in subscribers:
+                return
+            subscribers.remove(callback)
+            self._topics.remove(signal_type, callback)
+            self._routes.clear()
+            queue = self._queues.get(callback)
+            if queue is None:
+                return
+            queue.refs -= 1
+            if queue.refs > 0:
+                return
+            del self._queues[callback]
+        with self._queue_state:
+            queue.closed = True
+            if not queue.scheduled:
+                self._pending -= len(queue.items)
+                queue.items.clear()
+            self._queue_state.notify_all()
+
+    def add_tap(self, tap: BatchSubscriber) -> None:
+        with self._lock:
+            self._taps = (*self._taps, tap)
+
+    def remove_tap(self, tap: BatchSubscriber) -> None:
+        with self._lock:
+            self._taps = tuple(existing for existing in self._taps if existing != tap)
 
     def publish(self, signal: WorldSignal) -> None:
+        if self._taps:
+            self._tap([signal])
+        metrics = self.metrics
+        if metrics is not None and metrics.enabled:
+            start = time.perf_counter()
+            try:
+                self._publish(signal)
+            finally:
+                metrics.record_publish(signal.type, time.perf_counter() - start)
+            return
+        self._publish(signal)
+
+    def publish_many(self, signals: Iterable[WorldSignal]) -> None:
+        signals = list(signals)
+        if not signals:
+            return
+        if self._taps:
+            self._tap(signals)
+        metrics = self.metrics
+        if metrics is not None and metrics.enabled:
+            start = time.perf_counter()
+            try:
+                self._publish_many(signals)
+            finally:
+                share = (time.perf_counter() - start) / len(signals)
+                for signal in signals:
+                    metrics.record_publish(signal.type, share)
+            return
+        self._publish_many(signals)
+
+    def _tap(self, signals: List[WorldSignal]) -> None:
+        # Taps run synchronously on the publishing thread, before routing or queueing.
+        for tap in self._taps:
+            try:
+                tap(signals)
+            except Exception:
+                logging.exception("Signal tap failed on %d signal(s)", len(signals))
+
+    def _publish(self, signal: WorldSignal) -> None:
+        with self._lock:
+            subscribers = self._route(signal.type)
+            if self.mode == "async":
+                queues = [self._queues[callback] for callback in subscribers]
+                policy = self._overflow.get(signal.type, self.default_overflow)
+        if self.mode == "sync":
+            for callback in subscribers:
+                self._deliver(callback, signal)
+            return
+        for queue in queues:
+            self._enqueue(queue, signal, policy)
+
+    def _publish_many(self, signals: List[WorldSignal]) -> None:
+        with self._lock:
+            routed = [(signal, self._route(signal.type)) for signal in signals]
+            policies = [self._overflow.get(signal.type, self.default_overflow) for signal in signals]
+            queues = dict(self._queues)
+        if self.mode == "async":
+            for (signal, subscribers), policy in zip(routed, policies):
+                for callback in subscribers:
+                    self._enqueue(queues[callback], signal, policy)
+            return
+        for signal, subscribers in routed:
+            for callback in subscribers:
+                self._deliver(callback, signal)
+
+    def _route(self, signal_type: str) -> Tuple[Subscriber, ...]:
+        subscribers = self._routes.get(signal_type)
+        if subscribers is None:
+            if len(self._routes) >= self.route_cache_size:
+                self._routes.clear()
+            subscribers = self._routes[signal_type] = self._topics.match(signal_type)
+        return subscribers
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        with self._queue_state:
+            return self._queue_state.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def flush(self) -> None:
+        self.drain()
+
+    def close(self) -> None:
+        if self._executor is None:
+            return
+        self.drain()
+        with self._queue_state:
+            self._closed = True
+        # Signals enqueued between the first drain and closing still get delivered.
+        self.drain()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def stats(self) -> Dict[str, int]:
         with self._lock:
-            subscribers = list(self._subscribers.get(signal.type, []))
-            subscribers += self._subscribers.get("*", [])
-        for callback in subscribers:
+            queues = list(self._queues.values())
+        with self._queue_state:
+            return {
+                "pending": self._pending,
+                "dropped": sum(queue.dropped for queue in queues),
+                "coalesced": sum(queue.coalesced for queue in queues),
+                "overfilled": sum(queue.overfilled for queue in queues),
+            }
+
+    def _deliver(self, callback: Subscriber, signal: WorldSignal) -> None:
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            callback(signal)
+            return
+        start = time.perf_counter()
+        try:
             callback(signal)
+        finally:
+            name = getattr(callback, "__qualname__", None) or repr(callback)
+            metrics.record_subscriber(name, time.perf_counter() - start)
+
+    def _deliver_batch(self, callback: Subscriber, batch_callback: BatchSubscriber, signals: List[WorldSignal]) -> None:
+        metrics = self.metrics
+        if metrics is None or not metrics.enabled:
+            batch_callback(signals)
+            return
+        start = time.perf_counter()
+        try:
+            batch_callback(signals)
+        finally:
+            name = getattr(callback, "__qualname__", None) or repr(callback)
+            metrics.record_subscriber(name, time.perf_counter() - start)
+
+    def _enqueue(self, queue: _SubscriberQueue, signal: WorldSignal, policy: str) -> None:
+        with self._queue_state:
+            if self._closed:
+                logging.warning("Dropped %s published after the signal bus closed", signal.type)
+                return
+            if queue.closed:
+                return
+            if policy == OVERFLOW_COALESCE_LATEST:
+                for index, queued in enumerate(queue.items):
+                    if queued.type == signal.type:
+                        queue.items[index] = signal
+                        queue.coalesced += 1
+                        return
+            while len(queue.items) >= queue.maxsize:
+                if policy == OVERFLOW_BLOCK:
+                    if getattr(self._local, "queue", None) is not None:
+                        # A bus worker must not wait: the drain job it waits for may be queued behind it.
+                        queue.overfilled += 1
+                        break
+                    self._queue_state.wait()
+                    if queue.closed:
+                        return
+                    continue
+                queue.items.popleft()
+                queue.dropped += 1
+                self._pending -= 1
+            queue.items.append(signal)
+            self._pending += 1
+            if not queue.scheduled:
+                queue.scheduled = True
+                self._schedule(queue)
+
+    def _schedule(self, queue: _SubscriberQueue) -> None:
+        executor = self._executor
+        if executor is None:
+            return
+        try:
+            executor.submit(self._drain_queue, queue)
+        except RuntimeError:
+            # Only a drain job re-queueing itself can race the executor shutdown, and by then the queue is empty.
+            pass
+
+    def _drain_queue(self, queue: _SubscriberQueue) -> None:
+        self._local.queue = queue
+        try:
+            if queue.batch_callback is not None:
+                self._drain_queue_batch(queue)
+                return
+            for _ in range(self.drain_batch):
+                with self._queue_state:
+                    if queue.closed:
+                        self._pending -= len(queue.items)
+                        queue.items.clear()
+                    if not queue.items:
+                        queue.scheduled = False
+                        self._queue_state.notify_all()
+                        return
+                    signal = queue.items.popleft()
+                    self._queue_state.notify_all()
+                try:
+                    self._deliver(queue.callback, signal)
+                except Exception:
+                    logging.exception("Subscriber failed while handling %s", signal.type)
+                finally:
+                    with self._queue_state:
+                        self._pending -= 1
+                        self._queue_state.notify_all()
+            self._schedule(queue)
+        finally:
+            self._local.queue = None
+
+    def _drain_queue_batch(self, queue: _SubscriberQueue) -> None:
+        with self._queue_state:
+            if queue.closed:
+                self._pending -= len(queue.items)
+                queue.items.clear()
+            if not queue.items:
+                queue.scheduled = False
+                self._queue_state.notify_all()
+                return
+            count = min(len(queue.items), self.drain_batch)
+            signals = [queue.items.popleft() for _ in range(count)]
+            self._queue_state.notify_all()
+        try:
+            self._deliver_batch(queue.callback, queue.batch_callback, signals)
+        except Exception:
+            logging.exception("Subscriber failed while handling a batch of %d signal(s)", count)
+        finally:
+            with self._queue_state:
+                self._pending -= count
+                self._queue_state.notify_all()
+        self._schedule(queue)
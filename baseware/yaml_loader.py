@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Any, Tuple
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
 
 
 def parse_yaml(text: str) -> Any:
@@ -9,6 +12,62 @@ def parse_yaml(text: str) -> Any:
     return parsed
 
 
+class ParsedFileCache:
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Path, Tuple[int, int, Any]]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, path: Path) -> Optional[Any]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self.invalidate(path)
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == key:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        data = parse_yaml(path.read_text(encoding="utf-8"))
+        with self._lock:
+            self._discard(path)
+            if stat.st_size <= self.max_bytes:
+                self._entries[path] = (key[0], key[1], data)
+                self._total_bytes += stat.st_size
+                while self._total_bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._discard(oldest)
+        return data
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._discard(path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def _discard(self, path: Path) -> None:
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+
+parsed_file_cache = ParsedFileCache()
+
+
+def load_yaml_file(path: Path) -> Optional[Any]:
+    return parsed_file_cache.load(path)
+
+
 def _parse_block(lines: list[str], start: int, indent: int) -> Tuple[Any, int]:
     items: list[Any] = []
     mapping: dict[str, Any] = {}
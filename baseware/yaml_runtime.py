@@ -1,173 +1,468 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
 
+from baseware import event_bundle
+from baseware.metrics import Metrics
 from baseware.models import Action, WorldSignal
 from baseware.save_store import SaveStore
-from baseware.yaml_loader import parse_yaml
+from baseware.scheduler import TIMER_SCHEDULES, CronSpec
+from baseware.symbols import intern
+from baseware.yaml_loader import load_yaml_file, parse_yaml
 
+Evaluator = Callable[["SignalContext"], Any]
 
-@dataclass
+_MISSING = object()
+
+
+class SignalContext:
+    # Read-only view over one signal for a ghost; rebound per signal instead of copying the payload.
+    __slots__ = ("payload", "type", "vars", "strings")
+
+    def __init__(self, vars: Dict[str, Any], strings: Optional[Dict[str, Any]] = None) -> None:
+        self.payload: Mapping[str, Any] = {}
+        self.type = ""
+        self.vars = vars
+        self.strings = strings
+
+    def bind(self, signal: WorldSignal) -> "SignalContext":
+        self.payload = signal.payload
+        self.type = signal.type
+        return self
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "strings" and self.strings is not None:
+            return self.strings
+        value = self.payload.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key == "type":
+            return self.type
+        if key == "vars":
+            return self.vars
+        return default
+
+
+@dataclass(frozen=True, slots=True)
+class Template:
+    source: str
+    parts: Tuple[Any, ...]
+
+    @classmethod
+    def compile(cls, text: str) -> "Template":
+        parts: list[Any] = []
+        start = 0
+        while True:
+            open_at = text.find("${", start)
+            if open_at == -1:
+                break
+            close_at = text.find("}", open_at)
+            if close_at == -1:
+                break
+            if open_at > start:
+                parts.append(text[start:open_at])
+            parts.append(_compile_lookup(tuple(text[open_at + 2 : close_at].split("."))))
+            start = close_at + 1
+        if start < len(text):
+            parts.append(text[start:])
+        return cls(source=text, parts=tuple(parts))
+
+    @property
+    def is_constant(self) -> bool:
+        return all(isinstance(part, str) for part in self.parts)
+
+    def render(self, context: SignalContext) -> str:
+        chunks: list[str] = []
+        for part in self.parts:
+            if isinstance(part, str):
+                chunks.append(part)
+            else:
+                chunks.append(str(part(context)))
+        return "".join(chunks)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAction:
+    kind: str
+    key: Optional[str] = None
+    value: Optional[Evaluator] = None
+    surface_id: Optional[str] = None
+    params: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True)
 class YamlEvent:
     name: str
     conditions: List[dict]
     actions: List[dict]
+    source: str = ""
+    condition: Evaluator = field(default=lambda context: True, repr=False, compare=False)
+    compiled_actions: Tuple[CompiledAction, ...] = field(default=(), repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, name: str, conditions: Any, actions: Any, source: str = "") -> "YamlEvent":
+        try:
+            condition = _compile_conditions(conditions)
+            compiled_actions = _compile_actions(actions)
+        except ValueError as exc:
+            raise ValueError(f"{source or name}: {exc}") from None
+        return cls(
+            name=intern(name),
+            conditions=conditions or [],
+            actions=actions or [],
+            source=source,
+            condition=condition,
+            compiled_actions=compiled_actions,
+        )
+
+
+def _compile_lookup(parts: Tuple[str, ...]) -> Evaluator:
+    head = parts[0]
+    if len(parts) == 1 and head not in ("type", "vars", "strings"):
+        return lambda context: context.payload.get(head, "")
+    return lambda context: _lookup_path(parts, context)
+
+
+def _lookup_path(parts: Tuple[str, ...], context: SignalContext) -> Any:
+    current: Any = context.get(parts[0], _MISSING)
+    for part in parts[1:]:
+        if not isinstance(current, dict):
+            return ""
+        current = current.get(part, _MISSING)
+    return "" if current is _MISSING else current
+
+
+def _compile_value(value: Any) -> Evaluator:
+    if not isinstance(value, str):
+        return lambda context: value
+    template = Template.compile(value)
+    if template.is_constant:
+        value = intern(value)
+        return lambda context: value
+    return template.render
+
+
+def _compile_operands(operator: str, operands: Any) -> Tuple[Evaluator, Evaluator]:
+    if not isinstance(operands, list) or len(operands) != 2:
+        raise ValueError(f"'{operator}' expects two operands, got {operands!r}")
+    return _compile_value(operands[0]), _compile_value(operands[1])
+
+
+def _compile_condition(condition: Any) -> Evaluator:
+    if not isinstance(condition, dict):
+        raise ValueError(f"Invalid condition: {condition!r}")
+    if not condition:
+        return lambda context: True
+    if "eq" in condition:
+        left, right = _compile_operands("eq", condition["eq"])
+        return lambda context: left(context) == right(context)
+    if "lt" in condition:
+        left, right = _compile_operands("lt", condition["lt"])
+        return lambda context: left(context) < right(context)
+    if "gt" in condition:
+        left, right = _compile_operands("gt", condition["gt"])
+        return lambda context: left(context) > right(context)
+    if "and" in condition:
+        children = _compile_condition_list("and", condition["and"])
+        return lambda context: all(child(context) for child in children)
+    if "or" in condition:
+        children = _compile_condition_list("or", condition["or"])
+        return lambda context: any(child(context) for child in children)
+    raise ValueError(f"Unknown condition operator: {', '.join(condition)}")
+
+
+def _compile_condition_list(operator: str, items: Any) -> Tuple[Evaluator, ...]:
+    if not isinstance(items, list):
+        raise ValueError(f"'{operator}' expects a list of conditions, got {items!r}")
+    return tuple(_compile_condition(item) for item in items)
+
+
+def _compile_conditions(conditions: Any) -> Evaluator:
+    if not conditions:
+        return lambda context: True
+    children = _compile_condition_list("when", conditions)
+    if len(children) == 1:
+        return children[0]
+    return lambda context: all(child(context) for child in children)
+
+
+def _compile_actions(actions: Any) -> Tuple[CompiledAction, ...]:
+    if not actions:
+        return ()
+    if not isinstance(actions, list):
+        raise ValueError(f"'actions' must be a list, got {actions!r}")
+    return tuple(_compile_action(action) for action in actions)
+
+
+def _compile_action(action: Any) -> CompiledAction:
+    if not isinstance(action, dict):
+        raise ValueError(f"Invalid action: {action!r}")
+    if "say" in action:
+        return CompiledAction(kind="say", value=Template.compile(str(action["say"])).render)
+    if "set_surface" in action:
+        return CompiledAction(kind="set_surface", surface_id=intern(str(action["set_surface"])))
+    for kind in ("set_var", "add_var"):
+        if kind in action:
+            payload = action[kind]
+            if not isinstance(payload, dict) or "key" not in payload or "value" not in payload:
+                raise ValueError(f"'{kind}' expects 'key' and 'value', got {payload!r}")
+            return CompiledAction(kind=kind, key=str(payload["key"]), value=_compile_value(payload["value"]))
+    if "set_timer" in action:
+        return _compile_set_timer(action["set_timer"])
+    if "cancel_timer" in action:
+        return CompiledAction(kind="cancel_timer", key=str(action["cancel_timer"]))
+    if "noop" in action:
+        return CompiledAction(kind="noop")
+    raise ValueError(f"Unknown action: {', '.join(action)}")
+
+
+def _compile_set_timer(payload: Any) -> CompiledAction:
+    if not isinstance(payload, dict) or "id" not in payload:
+        raise ValueError(f"'set_timer' expects an 'id', got {payload!r}")
+    schedules = [name for name in TIMER_SCHEDULES if name in payload]
+    if len(schedules) != 1:
+        raise ValueError(f"'set_timer' expects exactly one of {', '.join(TIMER_SCHEDULES)}, got {payload!r}")
+    schedule = schedules[0]
+    value = payload[schedule]
+    if schedule in ("after", "every"):
+        if not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"'set_timer.{schedule}' must be a positive number of seconds, got {value!r}")
+    elif schedule == "at":
+        CronSpec.daily(str(value))
+    else:
+        CronSpec.parse(str(value))
+    timer_id = str(payload["id"])
+    params = {
+        schedule: value if schedule in ("after", "every") else str(value),
+        "event": str(payload.get("event") or f"ghost.timer.{timer_id}"),
+    }
+    return CompiledAction(kind="set_timer", key=timer_id, params=params)
+
+
+@dataclass
+class ReloadReport:
+    events: List[str] = field(default_factory=list)
+    strings: bool = False
+    state: bool = False
+    elapsed: float = 0.0
 
 
 class YamlGhostRunner:
-    def __init__(self, ghost_id: str, ghost_dir: Path, save_store: SaveStore) -> None:
+    def __init__(
+        self,
+        ghost_id: str,
+        ghost_dir: Path,
+        save_store: SaveStore,
+        metrics: Optional[Metrics] = None,
+        cache_dir: Optional[Path] = None,
+    ) -> None:
         self.ghost_id = ghost_id
         self.ghost_dir = ghost_dir
         self.save_store = save_store
-        self.events = self._load_events()
+        self.metrics = metrics
+        self.cache_dir = cache_dir
+        self._lock = threading.RLock()
+        self._bundle_key: Optional[str] = None
+        self._bundle_hit = False
+        self._vars_dirty = False
+        sources = self._load_sources()
+        self.events = self._compile_events(sources["events"])
+        self._events_by_source = {event.source: event for event in self.events}
+        self._event_index = self._build_event_index(self.events)
+        self._store_bundle(sources)
+        self.strings = sources["strings"] if isinstance(sources["strings"], dict) else None
         self.vars = self._load_vars()
-        self._apply_initial_state()
+        self._apply_initial_state(sources["state"])
         self._save_vars()
 
+    def topics(self) -> list[str]:
+        return sorted(self._event_index)
+
+    def surface_ids(self) -> list[str]:
+        surface_ids: dict[str, None] = {}
+        for event in self.events:
+            for action in event.compiled_actions:
+                if action.kind == "set_surface":
+                    surface_ids.setdefault(action.surface_id, None)
+        return list(surface_ids)
+
     def handle_signal(self, signal: WorldSignal) -> list[Action]:
+        with self._lock:
+            actions = self._handle_signal(signal, self._shared_context())
+            self._flush_vars()
+            return actions
+
+    def handle_signals(self, signals: Iterable[WorldSignal]) -> list[Action]:
         actions: list[Action] = []
-        context = self._build_context(signal)
-        for event in self.events:
-            if not self._matches_event(event.name, signal.type):
-                continue
-            if not self._conditions_met(event.conditions, context):
+        with self._lock:
+            shared = self._shared_context()
+            for signal in signals:
+                actions.extend(self._handle_signal(signal, shared))
+            self._flush_vars()
+        return actions
+
+    def reload(self, paths: Iterable[Path]) -> ReloadReport:
+        start = time.perf_counter()
+        report = ReloadReport()
+        ghost_root = self.ghost_dir / "ghost"
+        events_by_source = dict(self._events_by_source)
+        strings = self.strings
+        state: Any = None
+        for path in paths:
+            if path.parent == ghost_root / "events" and path.suffix == ".yaml":
+                raw_event = self._parse_event_file(path) if path.exists() else None
+                if raw_event is None:
+                    events_by_source.pop(path.name, None)
+                else:
+                    events_by_source[path.name] = self._compile_events([raw_event])[0]
+                report.events.append(path.name)
+            elif path == ghost_root / "strings.yaml":
+                data = load_yaml_file(path)
+                strings = data if isinstance(data, dict) else None
+                report.strings = True
+            elif path == ghost_root / "state.yaml":
+                state = load_yaml_file(path)
+                report.state = True
+        events = [events_by_source[source] for source in sorted(events_by_source)]
+        event_index = self._build_event_index(events)
+        with self._lock:
+            self.events = events
+            self._events_by_source = events_by_source
+            self._event_index = event_index
+            self.strings = strings
+            if report.state:
+                self._apply_initial_state(state)
+                self._save_vars()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _handle_signal(self, signal: WorldSignal, shared: SignalContext) -> list[Action]:
+        actions: list[Action] = []
+        candidates = self._event_index.get(signal.type)
+        if not candidates:
+            return actions
+        context = shared.bind(signal)
+        metrics = self.metrics
+        if metrics is not None and metrics.enabled:
+            for event in candidates:
+                start = time.perf_counter()
+                if event.condition(context):
+                    actions.extend(self._execute_actions(event.compiled_actions, context))
+                metrics.record_event(self.ghost_id, event.source, time.perf_counter() - start)
+            return actions
+        for event in candidates:
+            if not event.condition(context):
                 continue
-            actions.extend(self._execute_actions(event.actions, context))
+            actions.extend(self._execute_actions(event.compiled_actions, context))
         return actions
 
-    def _load_events(self) -> list[YamlEvent]:
+    def _load_sources(self) -> event_bundle.EventBundle:
+        if self.cache_dir is not None:
+            self._bundle_key = event_bundle.bundle_key(self.ghost_dir)
+            bundle = event_bundle.load_bundle(
+                event_bundle.bundle_path(self.cache_dir, self.ghost_id),
+                self._bundle_key,
+            )
+            if bundle is not None:
+                self._bundle_hit = True
+                return bundle
+        return {
+            "events": self._parse_events(),
+            "state": load_yaml_file(self.ghost_dir / "ghost" / "state.yaml"),
+            "strings": load_yaml_file(self.ghost_dir / "ghost" / "strings.yaml"),
+        }
+
+    def _store_bundle(self, sources: event_bundle.EventBundle) -> None:
+        if self.cache_dir is None or self._bundle_key is None or self._bundle_hit:
+            return
+        event_bundle.store_bundle(
+            event_bundle.bundle_path(self.cache_dir, self.ghost_id),
+            self._bundle_key,
+            sources,
+        )
+
+    def _parse_events(self) -> list[list[Any]]:
         events_dir = self.ghost_dir / "ghost" / "events"
         if not events_dir.exists():
             return []
-        events: list[YamlEvent] = []
+        events: list[list[Any]] = []
         for path in sorted(events_dir.glob("*.yaml")):
-            data = parse_yaml(path.read_text(encoding="utf-8"))
-            if not data:
-                continue
-            events.append(
-                YamlEvent(
-                    name=str(data.get("event", "")),
-                    conditions=data.get("when", []),
-                    actions=data.get("actions", []),
-                )
-            )
+            raw_event = self._parse_event_file(path)
+            if raw_event is not None:
+                events.append(raw_event)
         return events
 
+    @staticmethod
+    def _parse_event_file(path: Path) -> Optional[list[Any]]:
+        data = parse_yaml(path.read_text(encoding="utf-8"))
+        if not data:
+            return None
+        return [
+            path.name,
+            str(data.get("event", "")),
+            data.get("when", []),
+            data.get("actions", []),
+        ]
+
+    @staticmethod
+    def _compile_events(raw_events: list[list[Any]]) -> list[YamlEvent]:
+        return [
+            YamlEvent.compile(name=name, conditions=conditions, actions=actions, source=source)
+            for source, name, conditions, actions in raw_events
+        ]
+
+    @staticmethod
+    def _build_event_index(events: list[YamlEvent]) -> dict[str, tuple[YamlEvent, ...]]:
+        # Signals match an event by exact name or by any dotted prefix of it.
+        index: dict[str, list[YamlEvent]] = {}
+        for event in events:
+            parts = event.name.split(".")
+            for depth in range(1, len(parts) + 1):
+                index.setdefault(intern(".".join(parts[:depth])), []).append(event)
+        return {prefix: tuple(matches) for prefix, matches in index.items()}
+
     def _load_vars(self) -> dict[str, Any]:
         payload = self.save_store.load()
         return payload.get("vars", {})
 
-    def _apply_initial_state(self) -> None:
-        state_path = self.ghost_dir / "ghost" / "state.yaml"
-        if not state_path.exists():
-            return
-        data = parse_yaml(state_path.read_text(encoding="utf-8"))
+    def _apply_initial_state(self, data: Any) -> None:
         if isinstance(data, dict):
             for key, value in data.items():
                 self.vars.setdefault(key, value)
 
     def _save_vars(self) -> None:
         self.save_store.save(self.vars)
+        self._vars_dirty = False
 
-    def _matches_event(self, event_name: str, signal_type: str) -> bool:
-        return event_name == signal_type or event_name.startswith(f"{signal_type}.")
-
-    def _conditions_met(self, conditions: list[dict], context: dict[str, Any]) -> bool:
-        if not conditions:
-            return True
-        return all(self._evaluate_condition(condition, context) for condition in conditions)
-
-    def _evaluate_condition(self, condition: dict, context: dict[str, Any]) -> bool:
-        if not condition:
-            return True
-        if "eq" in condition:
-            left, right = condition["eq"]
-            return self._resolve_value(left, context) == self._resolve_value(right, context)
-        if "lt" in condition:
-            left, right = condition["lt"]
-            return self._resolve_value(left, context) < self._resolve_value(right, context)
-        if "gt" in condition:
-            left, right = condition["gt"]
-            return self._resolve_value(left, context) > self._resolve_value(right, context)
-        if "and" in condition:
-            return all(self._evaluate_condition(item, context) for item in condition["and"])
-        if "or" in condition:
-            return any(self._evaluate_condition(item, context) for item in condition["or"])
-        return False
-
-    def _execute_actions(self, actions: list[dict], context: dict[str, Any]) -> list[Action]:
+    def _flush_vars(self) -> None:
+        if self._vars_dirty:
+            self._save_vars()
+
+    def _execute_actions(self, actions: Tuple[CompiledAction, ...], context: SignalContext) -> list[Action]:
         results: list[Action] = []
         for action in actions:
-            if "say" in action:
-                text = self._interpolate(str(action["say"]), context)
-                results.append(Action(type="say", text=text))
-            elif "set_surface" in action:
-                surface_id = str(action["set_surface"])
-                results.append(Action(type="set_surface", id=surface_id))
-            elif "set_var" in action:
-                payload = action["set_var"]
-                key = str(payload["key"])
-                value = self._resolve_value(payload["value"], context)
-                self.vars[key] = value
-                self._save_vars()
-            elif "add_var" in action:
-                payload = action["add_var"]
-                key = str(payload["key"])
-                delta = self._resolve_value(payload["value"], context)
-                current = self.vars.get(key, 0)
-                self.vars[key] = current + delta
-                self._save_vars()
-            elif "noop" in action:
+            if action.kind == "say":
+                results.append(Action(type="say", text=action.value(context)))
+            elif action.kind == "set_surface":
+                results.append(Action(type="set_surface", id=action.surface_id))
+            elif action.kind == "set_var":
+                self.vars[action.key] = action.value(context)
+                self._vars_dirty = True
+            elif action.kind == "add_var":
+                current = self.vars.get(action.key, 0)
+                self.vars[action.key] = current + action.value(context)
+                self._vars_dirty = True
+            elif action.kind == "set_timer":
+                results.append(Action(type="set_timer", id=action.key, params=dict(action.params)))
+            elif action.kind == "cancel_timer":
+                results.append(Action(type="cancel_timer", id=action.key))
+            elif action.kind == "noop":
                 results.append(Action(type="noop"))
         return results
 
-    def _build_context(self, signal: WorldSignal) -> dict[str, Any]:
-        context = dict(signal.payload)
-        context.setdefault("type", signal.type)
-        context.setdefault("vars", self.vars)
-        strings_path = self.ghost_dir / "ghost" / "strings.yaml"
-        if strings_path.exists():
-            data = parse_yaml(strings_path.read_text(encoding="utf-8"))
-            if isinstance(data, dict):
-                context["strings"] = data
-        return context
-
-    def _resolve_value(self, value: Any, context: dict[str, Any]) -> Any:
-        if isinstance(value, str):
-            return self._interpolate(value, context)
-        return value
-
-    def _interpolate(self, template: str, context: dict[str, Any]) -> str:
-        result = template
-        for placeholder in self._extract_placeholders(template):
-            replacement = self._lookup_placeholder(placeholder, context)
-            result = result.replace(f"${{{placeholder}}}", str(replacement))
-        return result
-
-    @staticmethod
-    def _extract_placeholders(text: str) -> list[str]:
-        placeholders: list[str] = []
-        start = 0
-        while True:
-            start = text.find("${", start)
-            if start == -1:
-                break
-            end = text.find("}", start)
-            if end == -1:
-                break
-            placeholders.append(text[start + 2 : end])
-            start = end + 1
-        return placeholders
-
-    @staticmethod
-    def _lookup_placeholder(path: str, context: dict[str, Any]) -> Any:
-        parts = path.split(".")
-        current: Any = context
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return ""
-        return current
+    def _shared_context(self) -> SignalContext:
+        return SignalContext(self.vars, self.strings)
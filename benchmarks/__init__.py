@@ -0,0 +1 @@
+"""UkaiHost micro-benchmarks."""
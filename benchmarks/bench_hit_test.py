@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from baseware.hit_test import HitboxGrid
+from baseware.models import Hitbox
+
+
+def make_hitboxes(count: int, width: int = 2000, height: int = 2000, seed: int = 1) -> List[Hitbox]:
+    rng = random.Random(seed)
+    return [
+        Hitbox(
+            id=f"hitbox{index}",
+            x=rng.randrange(width),
+            y=rng.randrange(height),
+            w=rng.randrange(4, 80),
+            h=rng.randrange(4, 80),
+        )
+        for index in range(count)
+    ]
+
+
+def make_points(count: int, width: int = 2000, height: int = 2000, seed: int = 2) -> List[Tuple[int, int]]:
+    rng = random.Random(seed)
+    return [(rng.randrange(width), rng.randrange(height)) for _ in range(count)]
+
+
+def linear_hit(hitboxes: List[Hitbox], x: int, y: int) -> Optional[Hitbox]:
+    for hitbox in hitboxes:
+        if hitbox.x <= x <= hitbox.x + hitbox.w and hitbox.y <= y <= hitbox.y + hitbox.h:
+            return hitbox
+    return None
+
+
+def run(hitboxes: int = 5000, points: int = 20000) -> Dict[str, float]:
+    boxes = make_hitboxes(hitboxes)
+    samples = make_points(points)
+    start = time.perf_counter()
+    grid = HitboxGrid(boxes)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = [linear_hit(boxes, x, y) for x, y in samples]
+    linear_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = grid.hit_many(samples)
+    grid_seconds = time.perf_counter() - start
+    if actual != expected:
+        raise AssertionError("Grid hit-test disagrees with linear scan")
+    return {
+        "hitboxes": hitboxes,
+        "points": points,
+        "grid_build_ms": build_seconds * 1000,
+        "linear_us_per_point": linear_seconds / points * 1_000_000,
+        "grid_us_per_point": grid_seconds / points * 1_000_000,
+        "speedup": linear_seconds / grid_seconds if grid_seconds else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare grid hit-testing against a linear hitbox scan.")
+    parser.add_argument("--hitboxes", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=20000)
+    args = parser.parse_args()
+    for key, value in run(args.hitboxes, args.points).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from baseware.ghost_manager import GhostManager
+from baseware.models import Action, WorldSignal
+from baseware.renderer import Renderer
+from baseware.world_signal_bus import WorldSignalBus
+from benchmarks.synthetic import GhostSpec, make_ghost_root
+
+
+def _write_ghost_files(root: Path, events: int) -> None:
+    for ghost_dir in sorted((root / "ghosts").iterdir()):
+        events_dir = ghost_dir / "ghost" / "events"
+        (events_dir / "tick.yaml").write_text(
+            "event: bench.tick\nactions:\n  - say: \"tick ${round}\"\n",
+            encoding="utf-8",
+        )
+        for index in range(events):
+            (events_dir / f"load_{index:03d}.yaml").write_text(
+                f"event: bench.tick\nwhen:\n  - eq: [\"${{type}}\", \"bench.tick\"]\nactions:\n  - noop: true\n",
+                encoding="utf-8",
+            )
+
+
+def _measure(root: Path, isolation: str, signals: int) -> float:
+    bus = WorldSignalBus()
+    manager = GhostManager(root, bus, Renderer(), write_behind_saves=True, isolation=isolation)
+    manager.scan_installed()
+    ghost_ids = [manifest.id for manifest in manager.listGhosts()]
+    expected = len(ghost_ids) * signals
+    received = [0]
+    done = threading.Event()
+    apply_actions = manager._apply_actions
+
+    def _count(ghost_id: str, actions: List[Action]) -> None:
+        apply_actions(ghost_id, actions)
+        received[0] += sum(1 for action in actions if action.type == "say")
+        if received[0] >= expected:
+            done.set()
+
+    manager._apply_actions = _count
+    if manager.runner_pool is not None:
+        manager.runner_pool.on_actions = _count
+    for ghost_id in ghost_ids:
+        manager.launchGhost(ghost_id)
+    start = time.perf_counter()
+    for index in range(signals):
+        bus.publish(WorldSignal(type="bench.tick", payload={"type": "bench.tick", "round": index}))
+    done.wait(timeout=120)
+    elapsed = time.perf_counter() - start
+    manager.shutdown()
+    return elapsed
+
+
+def run(ghosts: int = 8, signals: int = 200, events: int = 50) -> Dict[str, float]:
+    workdir = Path(tempfile.mkdtemp(prefix="ukaihost-bench-isolation-"))
+    try:
+        root = make_ghost_root(workdir, ghosts, GhostSpec(events=0, surfaces=1, hitboxes=0))
+        _write_ghost_files(root, events)
+        thread_seconds = _measure(root, "thread", signals)
+        process_seconds = _measure(root, "process", signals)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "ghosts": ghosts,
+        "signals": signals,
+        "thread_ms": thread_seconds * 1000,
+        "process_ms": process_seconds * 1000,
+        "speedup": thread_seconds / process_seconds if process_seconds else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare in-process and worker-process ghost runners.")
+    parser.add_argument("--ghosts", type=int, default=8)
+    parser.add_argument("--signals", type=int, default=200)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+    for key, value in run(args.ghosts, args.signals, args.events).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from baseware.models import Action, WorldSignal
+from baseware.save_store import SaveStore
+from baseware.shell_loader import ShellLoader
+from baseware.yaml_loader import parsed_file_cache
+from baseware.yaml_runtime import YamlGhostRunner
+from benchmarks.synthetic import SIGNAL_TYPES, GhostSpec, make_ghost_root
+
+
+def retained_bytes(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def peak_bytes(operation: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        operation()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def make_signals(count: int, seed: int = 1) -> List[WorldSignal]:
+    rng = random.Random(seed)
+    signals = []
+    for _ in range(count):
+        signal_type = rng.choice(SIGNAL_TYPES)
+        payload = {"type": signal_type, "minute": rng.randrange(60), "hitbox": f"hitbox{rng.randrange(8)}"}
+        signals.append(WorldSignal(type=signal_type, payload=payload))
+    return signals
+
+
+def run(signals: int = 10000, surfaces: int = 64, hitboxes: int = 32) -> Dict[str, float]:
+    workdir = Path(tempfile.mkdtemp(prefix="ukaihost-bench-memory-"))
+    try:
+        spec = GhostSpec(surfaces=surfaces, hitboxes=hitboxes)
+        root = make_ghost_root(workdir, 1, spec)
+        ghost_dir = root / "ghosts" / "bench_ghost_0000"
+        sample = make_signals(signals)
+
+        def _signals() -> List[WorldSignal]:
+            return [WorldSignal(type=signal.type, payload=dict(signal.payload)) for signal in sample]
+
+        def _actions() -> List[Action]:
+            return [Action(type="say", text=signal.type) for signal in sample]
+
+        def _shell() -> Any:
+            ShellLoader.clear_cache()
+            shell = ShellLoader().load(ghost_dir / "shell", "surfaces.json")
+            return shell, [shell.surfaces[surface_id] for surface_id in shell.surfaces]
+
+        def _runner() -> YamlGhostRunner:
+            parsed_file_cache.clear()
+            return YamlGhostRunner("bench_ghost_0000", ghost_dir, SaveStore(ghost_dir / "ghost" / "save.json", True))
+
+        runner = _runner()
+        try:
+            dispatch_peak = peak_bytes(lambda: runner.handle_signals(sample))
+        finally:
+            runner.save_store.close()
+        runner_bytes = retained_bytes(_runner)
+        return {
+            "signals": signals,
+            "signal_bytes": retained_bytes(_signals) / signals,
+            "action_bytes": retained_bytes(_actions) / signals,
+            "hitbox_bytes": retained_bytes(_shell) / (surfaces * hitboxes),
+            "runner_kib": runner_bytes / 1024,
+            "dispatch_peak_bytes_per_signal": dispatch_peak / signals,
+        }
+    finally:
+        ShellLoader.clear_cache()
+        parsed_file_cache.clear()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure retained and peak memory of signals, actions, shells and runners.")
+    parser.add_argument("--signals", type=int, default=10000)
+    parser.add_argument("--surfaces", type=int, default=64)
+    parser.add_argument("--hitboxes", type=int, default=32)
+    args = parser.parse_args()
+    for key, value in run(args.signals, args.surfaces, args.hitboxes).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
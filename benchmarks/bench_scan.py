@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+from baseware.ghost_manager import GhostManager
+from baseware.renderer import Renderer
+from baseware.world_signal_bus import WorldSignalBus
+from benchmarks.synthetic import GhostSpec, make_ghost_root
+
+
+def _scan(root: Path) -> float:
+    manager = GhostManager(root, WorldSignalBus(), Renderer())
+    start = time.perf_counter()
+    manager.scan_installed()
+    return time.perf_counter() - start
+
+
+def run(ghosts: int = 200, repeats: int = 5) -> Dict[str, float]:
+    workdir = Path(tempfile.mkdtemp(prefix="ukaihost-bench-scan-"))
+    try:
+        root = make_ghost_root(workdir, ghosts, GhostSpec(events=1, surfaces=1))
+        index_path = root / "runtime" / "manifest_index.json"
+        cold = []
+        for _ in range(repeats):
+            index_path.unlink(missing_ok=True)
+            cold.append(_scan(root))
+        warm = [_scan(root) for _ in range(repeats)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "ghosts": ghosts,
+        "cold_ms": min(cold) * 1000,
+        "warm_ms": min(warm) * 1000,
+        "speedup": min(cold) / min(warm) if min(warm) else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time cold and warm GhostManager.scan_installed runs.")
+    parser.add_argument("--ghosts", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    for key, value in run(args.ghosts, args.repeats).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
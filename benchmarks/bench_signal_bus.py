@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from typing import Callable, Dict, List
+
+from baseware.models import Subscriber, WorldSignal
+from baseware.world_signal_bus import WorldSignalBus
+
+SIGNAL_TYPES = [
+    "world.boot",
+    "world.clock",
+    "world.clock.minute_change",
+    "world.uptime",
+    "world.input.click",
+    "world.presence.changed",
+    "world.power",
+    "world.network",
+]
+
+
+class ListConcatBus:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, signal_type: str, callback: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.setdefault(signal_type, []).append(callback)
+
+    def publish(self, signal: WorldSignal) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(signal.type, []))
+            subscribers += self._subscribers.get("*", [])
+        for callback in subscribers:
+            callback(signal)
+
+
+def _filtering_subscriber(interests: set[str], counter: List[int]) -> Subscriber:
+    def _callback(signal: WorldSignal) -> None:
+        if signal.type in interests:
+            counter[0] += 1
+
+    return _callback
+
+
+def _counting_subscriber(counter: List[int]) -> Subscriber:
+    def _callback(signal: WorldSignal) -> None:
+        counter[0] += 1
+
+    return _callback
+
+
+def _interests(index: int) -> set[str]:
+    return {SIGNAL_TYPES[index % len(SIGNAL_TYPES)], "world.boot"}
+
+
+def bench_list_concat(subscribers: int, signals: List[WorldSignal]) -> tuple[float, int]:
+    bus = ListConcatBus()
+    counter = [0]
+    for index in range(subscribers):
+        bus.subscribe("*", _filtering_subscriber(_interests(index), counter))
+    return _time_publish(bus.publish, signals), counter[0]
+
+
+def bench_topic_trie(subscribers: int, signals: List[WorldSignal]) -> tuple[float, int]:
+    bus = WorldSignalBus()
+    counter = [0]
+    for index in range(subscribers):
+        callback = _counting_subscriber(counter)
+        for topic in sorted(_interests(index)):
+            bus.subscribe(topic, callback)
+    return _time_publish(bus.publish, signals), counter[0]
+
+
+def _time_publish(publish: Callable[[WorldSignal], None], signals: List[WorldSignal]) -> float:
+    start = time.perf_counter()
+    for signal in signals:
+        publish(signal)
+    return time.perf_counter() - start
+
+
+def run(subscribers: int = 200, rounds: int = 2000) -> Dict[str, float]:
+    signals = [
+        WorldSignal(type=SIGNAL_TYPES[index % len(SIGNAL_TYPES)], payload={"type": SIGNAL_TYPES[index % len(SIGNAL_TYPES)]})
+        for index in range(rounds)
+    ]
+    legacy_seconds, legacy_hits = bench_list_concat(subscribers, signals)
+    trie_seconds, trie_hits = bench_topic_trie(subscribers, signals)
+    if legacy_hits != trie_hits:
+        raise AssertionError(f"Delivery mismatch: list concat {legacy_hits}, topic trie {trie_hits}")
+    return {
+        "subscribers": subscribers,
+        "signals": rounds,
+        "list_concat_us_per_publish": legacy_seconds / rounds * 1_000_000,
+        "topic_trie_us_per_publish": trie_seconds / rounds * 1_000_000,
+        "speedup": legacy_seconds / trie_seconds if trie_seconds else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare topic-trie routing against list concatenation.")
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    for key, value in run(args.subscribers, args.rounds).items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
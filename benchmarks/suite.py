@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from baseware.archive_fs import archive_cache
+from baseware.ghost_manager import GhostManager
+from baseware.models import WorldSignal
+from baseware.renderer import Renderer
+from baseware.save_store import SaveStore
+from baseware.scheduler import Scheduler
+from baseware.shell_loader import ShellLoader
+from baseware.system_info import SystemInfoProvider
+from baseware.world_signal_bus import WorldSignalBus
+from baseware.yaml_loader import parse_yaml, parsed_file_cache
+from baseware.yaml_runtime import YamlGhostRunner
+from benchmarks.synthetic import SIGNAL_TYPES, GhostSpec, make_ghost_archive, make_ghost_root
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.15
+
+Result = Dict[str, float]
+
+
+@dataclass
+class SuiteConfig:
+    ghosts: int = 20
+    subscribers: int = 200
+    repeats: int = 5
+    spec: GhostSpec = field(default_factory=GhostSpec)
+
+
+@dataclass
+class _Fixture:
+    config: SuiteConfig
+    root: Path
+
+    def ghost_dir(self, index: int = 0) -> Path:
+        return self.root / "ghosts" / f"bench_ghost_{index:04d}"
+
+    def new_runner(self, write_behind: bool = True) -> YamlGhostRunner:
+        ghost_dir = self.ghost_dir()
+        return YamlGhostRunner("bench_ghost_0000", ghost_dir, SaveStore(ghost_dir / "ghost" / "save.json", write_behind))
+
+    def signals(self, count: int) -> List[WorldSignal]:
+        rng = random.Random(self.config.spec.seed)
+        signals = []
+        for _ in range(count):
+            signal_type = rng.choice(SIGNAL_TYPES)
+            payload = {"type": signal_type, "minute": rng.randrange(60), "hitbox": "hitbox0"}
+            signals.append(WorldSignal(type=signal_type, payload=payload))
+        return signals
+
+
+def measure(operation: Callable[[], Any], ops: int, repeats: int) -> Result:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        operation()
+        samples.append((time.perf_counter() - start) / ops * 1_000_000)
+    return {"us_per_op": statistics.median(samples), "min_us": min(samples), "ops": ops}
+
+
+def bench_parse_yaml(fixture: _Fixture) -> Result:
+    texts = [path.read_text(encoding="utf-8") for path in sorted((fixture.ghost_dir() / "ghost" / "events").glob("*.yaml"))]
+
+    def _parse() -> None:
+        for text in texts:
+            parse_yaml(text)
+
+    return measure(_parse, len(texts), fixture.config.repeats)
+
+
+def bench_runner_init(fixture: _Fixture) -> Result:
+    def _construct() -> None:
+        parsed_file_cache.clear()
+        fixture.new_runner().save_store.close()
+
+    return measure(_construct, 1, fixture.config.repeats)
+
+
+def bench_runner_init_cached(fixture: _Fixture) -> Result:
+    fixture.new_runner().save_store.close()
+
+    def _construct() -> None:
+        fixture.new_runner().save_store.close()
+
+    return measure(_construct, 1, fixture.config.repeats)
+
+
+def bench_handle_signal(fixture: _Fixture) -> Result:
+    runner = fixture.new_runner()
+    signals = fixture.signals(1000)
+
+    def _handle() -> None:
+        for signal in signals:
+            runner.handle_signal(signal)
+
+    try:
+        return measure(_handle, len(signals), fixture.config.repeats)
+    finally:
+        runner.save_store.close()
+
+
+def bench_handle_signals(fixture: _Fixture) -> Result:
+    runner = fixture.new_runner()
+    signals = fixture.signals(1000)
+
+    def _handle() -> None:
+        for start in range(0, len(signals), 32):
+            runner.handle_signals(signals[start : start + 32])
+
+    try:
+        return measure(_handle, len(signals), fixture.config.repeats)
+    finally:
+        runner.save_store.close()
+
+
+def bench_bus_publish(fixture: _Fixture) -> Result:
+    bus = WorldSignalBus()
+    counter = [0]
+
+    def _callback(signal: WorldSignal) -> None:
+        counter[0] += 1
+
+    for index in range(fixture.config.subscribers):
+        bus.subscribe(SIGNAL_TYPES[index % len(SIGNAL_TYPES)], _callback)
+        bus.subscribe("world.boot", _callback)
+    signals = fixture.signals(2000)
+
+    def _publish() -> None:
+        for signal in signals:
+            bus.publish(signal)
+
+    return measure(_publish, len(signals), fixture.config.repeats)
+
+
+def bench_save_store(fixture: _Fixture, write_behind: bool) -> Result:
+    store = SaveStore(fixture.root / "runtime" / f"bench_save_{int(write_behind)}.json", write_behind=write_behind)
+    store.ensure_initialized()
+    payloads = [{"counter": index, "name": "bench", "flags": list(range(16))} for index in range(200)]
+
+    def _save() -> None:
+        for payload in payloads:
+            store.save(payload)
+        store.flush()
+
+    try:
+        return measure(_save, len(payloads), fixture.config.repeats)
+    finally:
+        store.close()
+
+
+def bench_shell_load(fixture: _Fixture, cached: bool) -> Result:
+    loader = ShellLoader()
+    shell_dirs = [fixture.ghost_dir(index) / "shell" for index in range(fixture.config.ghosts)]
+
+    def _load() -> None:
+        if not cached:
+            ShellLoader.clear_cache()
+        for shell_dir in shell_dirs:
+            loader.load(shell_dir, "surfaces.json")
+
+    _load()
+    return measure(_load, len(shell_dirs), fixture.config.repeats)
+
+
+def bench_simulate_click(fixture: _Fixture) -> Result:
+    shell = ShellLoader().load(fixture.ghost_dir() / "shell", "surfaces.json")
+    renderer = Renderer()
+    character = renderer.create_character("bench_ghost_0000", shell, lambda hitbox_id, x, y, button: None)
+    rng = random.Random(fixture.config.spec.seed)
+    points = [(rng.randrange(400), rng.randrange(600)) for _ in range(5000)]
+
+    def _click() -> None:
+        for x, y in points:
+            character.simulate_click(x, y)
+
+    try:
+        return measure(_click, len(points), fixture.config.repeats)
+    finally:
+        renderer.shutdown()
+
+
+def bench_render_queue(fixture: _Fixture) -> Result:
+    shell = ShellLoader().load(fixture.ghost_dir() / "shell", "surfaces.json")
+    renderer = Renderer()
+    character = renderer.create_character("bench_ghost_0000", shell, lambda hitbox_id, x, y, button: None)
+    balloon = renderer.create_balloon("bench_ghost_0000", None)
+    surface_ids = list(shell.surfaces)
+    queue = renderer.queue
+
+    def _frames() -> None:
+        for frame in range(100):
+            for index in range(10):
+                queue.set_surface(character, surface_ids[(frame + index) % len(surface_ids)])
+                queue.say(balloon, "bench")
+            queue.tick()
+
+    try:
+        return measure(_frames, 2000, fixture.config.repeats)
+    finally:
+        renderer.shutdown()
+
+
+def bench_scan_installed(fixture: _Fixture, warm: bool) -> Result:
+    index_path = fixture.root / "runtime" / "manifest_index.json"
+
+    def _scan() -> None:
+        if not warm:
+            index_path.unlink(missing_ok=True)
+        GhostManager(fixture.root, WorldSignalBus(), Renderer()).scan_installed()
+
+    _scan()
+    return measure(_scan, fixture.config.ghosts, fixture.config.repeats)
+
+
+def bench_launch_ghost(fixture: _Fixture) -> Result:
+    renderer = Renderer()
+    manager = GhostManager(fixture.root, WorldSignalBus(), renderer)
+    manager.scan_installed()
+    ghost_ids = [manifest.id for manifest in manager.listGhosts()]
+
+    def _launch() -> None:
+        for ghost_id in ghost_ids:
+            manager.launchGhost(ghost_id)
+        for ghost_id in ghost_ids:
+            manager.closeGhost(ghost_id)
+
+    try:
+        return measure(_launch, len(ghost_ids), fixture.config.repeats)
+    finally:
+        manager.shutdown()
+        renderer.shutdown()
+
+
+def bench_system_poll(fixture: _Fixture, cached: bool) -> Result:
+    ttl = 60.0 if cached else 0.0
+    scheduler = Scheduler(WorldSignalBus(mode="sync"), SystemInfoProvider(power_ttl=ttl, network_ttl=ttl))
+    scheduler.system_signals(force=True)
+
+    def _poll() -> None:
+        for _ in range(1000):
+            scheduler.system_signals()
+
+    return measure(_poll, 1000, fixture.config.repeats)
+
+
+def bench_launch_ghost_archive(fixture: _Fixture) -> Result:
+    root = fixture.root / "archived"
+    ghosts_dir = root / "ghosts"
+    if not ghosts_dir.exists():
+        ghosts_dir.mkdir(parents=True)
+        for index in range(fixture.config.ghosts):
+            ghost_dir = fixture.ghost_dir(index)
+            make_ghost_archive(ghost_dir, ghosts_dir / f"{ghost_dir.name}.zip")
+    renderer = Renderer()
+    manager = GhostManager(root, WorldSignalBus(), renderer)
+    manager.scan_installed()
+    ghost_ids = [manifest.id for manifest in manager.listGhosts()]
+
+    def _launch() -> None:
+        for ghost_id in ghost_ids:
+            manager.launchGhost(ghost_id)
+        for ghost_id in ghost_ids:
+            manager.closeGhost(ghost_id)
+
+    try:
+        return measure(_launch, len(ghost_ids), fixture.config.repeats)
+    finally:
+        manager.shutdown()
+        renderer.shutdown()
+
+
+def bench_launch_ghosts(fixture: _Fixture) -> Result:
+    renderer = Renderer()
+    manager = GhostManager(fixture.root, WorldSignalBus(), renderer)
+    manager.scan_installed()
+    ghost_ids = [manifest.id for manifest in manager.listGhosts()]
+
+    def _launch() -> None:
+        manager.launchGhosts(ghost_ids)
+        for ghost_id in ghost_ids:
+            manager.closeGhost(ghost_id)
+
+    try:
+        return measure(_launch, len(ghost_ids), fixture.config.repeats)
+    finally:
+        manager.shutdown()
+        renderer.shutdown()
+
+
+BENCHMARKS: Dict[str, Callable[[_Fixture], Result]] = {
+    "yaml.parse_yaml": bench_parse_yaml,
+    "runner.init": bench_runner_init,
+    "runner.init_cached": bench_runner_init_cached,
+    "runner.handle_signal": bench_handle_signal,
+    "runner.handle_signals": bench_handle_signals,
+    "bus.publish": bench_bus_publish,
+    "save_store.save": lambda fixture: bench_save_store(fixture, write_behind=False),
+    "save_store.save_write_behind": lambda fixture: bench_save_store(fixture, write_behind=True),
+    "shell_loader.load": lambda fixture: bench_shell_load(fixture, cached=False),
+    "shell_loader.load_cached": lambda fixture: bench_shell_load(fixture, cached=True),
+    "renderer.simulate_click": bench_simulate_click,
+    "renderer.render_queue": bench_render_queue,
+    "ghost_manager.scan_installed": lambda fixture: bench_scan_installed(fixture, warm=False),
+    "ghost_manager.scan_installed_warm": lambda fixture: bench_scan_installed(fixture, warm=True),
+    "ghost_manager.launch_ghost": bench_launch_ghost,
+    "ghost_manager.launch_ghosts": bench_launch_ghosts,
+    "ghost_manager.launch_ghost_archive": bench_launch_ghost_archive,
+    "system_info.poll": lambda fixture: bench_system_poll(fixture, cached=False),
+    "system_info.poll_cached": lambda fixture: bench_system_poll(fixture, cached=True),
+}
+
+
+def run(config: SuiteConfig, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    names = [name for name in BENCHMARKS if not only or any(name.startswith(prefix) for prefix in only)]
+    workdir = Path(tempfile.mkdtemp(prefix="ukaihost-bench-suite-"))
+    results: Dict[str, Result] = {}
+    try:
+        fixture = _Fixture(config, make_ghost_root(workdir, config.ghosts, config.spec))
+        for name in names:
+            results[name] = BENCHMARKS[name](fixture)
+    finally:
+        ShellLoader.clear_cache()
+        parsed_file_cache.clear()
+        archive_cache.clear()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": asdict(config),
+        "benchmarks": results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    rows = []
+    for name, result in current["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if not reference or not reference.get("us_per_op"):
+            continue
+        ratio = result["us_per_op"] / reference["us_per_op"]
+        rows.append(
+            {
+                "name": name,
+                "baseline_us": reference["us_per_op"],
+                "current_us": result["us_per_op"],
+                "ratio": ratio,
+                "regression": ratio > 1 + threshold,
+            }
+        )
+    return rows
+
+
+def _print_results(results: Dict[str, Any]) -> None:
+    for name, result in results["benchmarks"].items():
+        print(f"{name:40} {result['us_per_op']:12.2f} us/op  (min {result['min_us']:.2f}, {result['ops']} ops)")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> None:
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:40} {row['baseline_us']:12.2f} -> {row['current_us']:12.2f} us/op"
+            f"  x{row['ratio']:.2f} {flag}".rstrip()
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time UkaiHost hot paths against synthetic ghosts.")
+    parser.add_argument("--ghosts", type=int, default=20)
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--condition-depth", type=int, default=2)
+    parser.add_argument("--template-density", type=int, default=3)
+    parser.add_argument("--surfaces", type=int, default=16)
+    parser.add_argument("--hitboxes", type=int, default=8)
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--only", nargs="*", help="run only benchmarks whose name starts with one of these prefixes")
+    parser.add_argument("--output", type=Path, help="write results JSON to this path")
+    parser.add_argument("--baseline", type=Path, help="compare against a results JSON and flag regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown ratio, e.g. 0.15")
+    parser.add_argument("--list", action="store_true", help="list benchmark names and exit")
+    args = parser.parse_args()
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return
+    config = SuiteConfig(
+        ghosts=args.ghosts,
+        subscribers=args.subscribers,
+        repeats=args.repeats,
+        spec=GhostSpec(
+            events=args.events,
+            condition_depth=args.condition_depth,
+            template_density=args.template_density,
+            surfaces=args.surfaces,
+            hitboxes=args.hitboxes,
+        ),
+    )
+    results = run(config, args.only)
+    _print_results(results)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        rows = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        print()
+        _print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import random
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+SIGNAL_TYPES = [
+    "world.boot",
+    "world.clock",
+    "world.clock.minute_change",
+    "world.uptime",
+    "world.input.click",
+    "world.presence.changed",
+    "world.power",
+    "world.network",
+]
+
+
+@dataclass(frozen=True)
+class GhostSpec:
+    events: int = 40
+    condition_depth: int = 2
+    template_density: int = 3
+    surfaces: int = 16
+    hitboxes: int = 8
+    seed: int = 1
+
+
+def make_condition(rng: random.Random, depth: int, indent: int) -> List[str]:
+    pad = " " * indent
+    if depth <= 0:
+        if rng.random() < 0.5:
+            return [f'{pad}- eq: ["${{type}}", "{rng.choice(SIGNAL_TYPES)}"]']
+        return [f'{pad}- eq: ["${{minute}}", "{rng.randrange(60)}"]']
+    lines = [f"{pad}- {rng.choice(['and', 'or'])}:"]
+    for _ in range(2):
+        lines.extend(make_condition(rng, depth - 1, indent + 2))
+    return lines
+
+
+def make_template(rng: random.Random, density: int) -> str:
+    fields = ["${type}", "${vars.counter}", "${strings.greeting}", "${hitbox}", "${minute}"]
+    words = [f"word{rng.randrange(1000)}" for _ in range(density + 1)]
+    parts: List[str] = []
+    for index, word in enumerate(words):
+        parts.append(word)
+        if index < density:
+            parts.append(rng.choice(fields))
+    return " ".join(parts)
+
+
+def make_event_text(rng: random.Random, spec: GhostSpec, surface_ids: List[str]) -> str:
+    lines = [f"event: {rng.choice(SIGNAL_TYPES)}", "when:"]
+    lines.extend(make_condition(rng, spec.condition_depth, 2))
+    lines.append("actions:")
+    lines.append(f'  - say: "{make_template(rng, spec.template_density)}"')
+    lines.append("  - add_var:")
+    lines.append("    key: counter")
+    lines.append("    value: 1")
+    if surface_ids:
+        lines.append(f"  - set_surface: {rng.choice(surface_ids)}")
+    return "\n".join(lines) + "\n"
+
+
+def make_surfaces(rng: random.Random, spec: GhostSpec) -> dict:
+    surfaces = {}
+    for index in range(spec.surfaces):
+        hitboxes = [
+            {
+                "id": f"hitbox{box}",
+                "x": rng.randrange(0, 360),
+                "y": rng.randrange(0, 560),
+                "w": rng.randrange(10, 80),
+                "h": rng.randrange(10, 80),
+            }
+            for box in range(spec.hitboxes)
+        ]
+        surfaces[f"surface{index:03d}"] = {"file": "", "hitbox": hitboxes}
+    return {"default": "surface000" if surfaces else "", "surfaces": surfaces}
+
+
+def make_ghost(ghosts_dir: Path, ghost_id: str, spec: GhostSpec) -> Path:
+    rng = random.Random(f"{spec.seed}:{ghost_id}")
+    ghost_dir = ghosts_dir / ghost_id
+    events_dir = ghost_dir / "ghost" / "events"
+    shell_dir = ghost_dir / "shell"
+    events_dir.mkdir(parents=True)
+    shell_dir.mkdir()
+    manifest = {
+        "id": ghost_id,
+        "name": f"Bench Ghost {ghost_id}",
+        "version": "0.1.0",
+        "author": "bench",
+        "entry": {"type": "yaml"},
+        "shell": {"default": "shell", "surfaces": "surfaces.json"},
+        "balloon": {"default": "default_balloon"},
+        "storage": {"mode": "inside_ghost", "path": "ghost/save.json"},
+    }
+    (ghost_dir / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    surfaces = make_surfaces(rng, spec)
+    (shell_dir / "surfaces.json").write_text(json.dumps(surfaces, indent=2), encoding="utf-8")
+    surface_ids = list(surfaces["surfaces"])
+    for index in range(spec.events):
+        (events_dir / f"event_{index:04d}.yaml").write_text(make_event_text(rng, spec, surface_ids), encoding="utf-8")
+    (ghost_dir / "ghost" / "state.yaml").write_text("counter: 0\n", encoding="utf-8")
+    (ghost_dir / "ghost" / "strings.yaml").write_text('greeting: "hello"\n', encoding="utf-8")
+    return ghost_dir
+
+
+def make_ghost_root(root: Path, ghosts: int, spec: GhostSpec = GhostSpec()) -> Path:
+    ghosts_dir = root / "ghosts"
+    for index in range(ghosts):
+        make_ghost(ghosts_dir, f"bench_ghost_{index:04d}", spec)
+    return root
+
+
+def make_ghost_archive(ghost_dir: Path, archive_path: Path, compression: int = zipfile.ZIP_DEFLATED) -> Path:
+    with zipfile.ZipFile(archive_path, "w", compression) as archive:
+        for path in sorted(ghost_dir.rglob("*")):
+            if path.is_file():
+                archive.write(path, path.relative_to(ghost_dir).as_posix())
+    return archive_path